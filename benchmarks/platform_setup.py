@@ -0,0 +1,120 @@
+"""Benchmark the platform setup work of a config entry.
+
+Compares forwarding every platform with forwarding only the platforms
+that have devices: the time to import the platform modules in a fresh
+interpreter and the time the platforms spend finding their devices, by
+scanning the device list or through the per platform index.
+
+Run from the repository root with ``python -m benchmarks.platform_setup``.
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+import timeit
+from typing import Any
+
+from aiolookin import Device
+
+from lookin import _platforms_for_devices
+from lookin.const import PLATFORMS, TYPE_TO_PLATFORM
+from lookin.models import LookinDeviceRecord, index_devices
+
+REPEAT = 3
+INFO = {
+    "Type": "Remote",
+    "MRDC": "02000105001K0000",
+    "Status": "Running",
+    "ID": "98F33011",
+    "Name": "Living",
+    "Time": "1630000000",
+    "Timezone": "+3",
+    "PowerMode": "5v",
+    "CurrentVoltage": "5610",
+    "Firmware": "2.38",
+    "Temperature": "54",
+    "HomeKit": "1",
+    "EcoMode": "off",
+    "SensorMode": "0",
+}
+INSTALLS: dict[str, dict[str, int]] = {
+    "tv only": {"01": 1},
+    "typical": {"01": 1, "EF": 1},
+    "large": {"01": 100, "03": 50, "EF": 50},
+}
+_IMPORT = """
+import time
+import lookin
+start = time.perf_counter()
+for module in {modules!r}:
+    __import__(f"lookin.{{module}}")
+print(time.perf_counter() - start)
+"""
+
+
+def _import_time(platforms: list[str]) -> float:
+    """Return the time to import the platform modules in a fresh interpreter."""
+    return min(
+        float(
+            subprocess.run(
+                [sys.executable, "-c", _IMPORT.format(modules=platforms)],
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(REPEAT)
+    )
+
+
+def _lookup(platforms: list[str], index: dict[Any, list[LookinDeviceRecord]]) -> None:
+    """Look the devices up in the index the way every platform does."""
+    for platform in platforms:
+        for _ in index.get(platform, ()):
+            continue
+
+
+def _scan(platforms: list[str], devices: list[dict[str, Any]]) -> None:
+    """Scan the device list the way every platform does."""
+    for platform in platforms:
+        for remote in devices:
+            if TYPE_TO_PLATFORM.get(remote["Type"]) != platform:
+                continue
+
+
+def main() -> None:
+    """Run the benchmark."""
+    lookin_device = Device(_data=INFO)
+    print(
+        f"{'install':>8} {'devices':>7} {'platforms':>9}"
+        f" {'import all ms':>13} {'import needed ms':>16}"
+        f" {'scan all us':>11} {'index needed us':>15}"
+    )
+    for name, types in INSTALLS.items():
+        devices = [
+            {"Type": device_type, "UUID": f"{device_type}{idx:02X}"}
+            for device_type, count in types.items()
+            for idx in range(count)
+        ]
+        needed = [
+            platform.value
+            for platform in _platforms_for_devices(
+                lookin_device, index_devices(devices)
+            )
+        ]
+        every = [platform.value for platform in PLATFORMS]
+        imports = [_import_time(platforms) * 1e3 for platforms in (every, needed)]
+        index = index_devices(devices)
+        scans = [
+            min(timeit.repeat(lambda: _scan(every, devices), number=100)) * 1e4,
+            min(timeit.repeat(lambda: _lookup(needed, index), number=100)) * 1e4,
+        ]
+        print(
+            f"{name:>8} {len(devices):>7} {len(needed):>4} of {len(every):<2}"
+            f" {imports[0]:>13.1f} {imports[1]:>16.1f}"
+            f" {scans[0]:>11.1f} {scans[1]:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
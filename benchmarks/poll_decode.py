@@ -0,0 +1,81 @@
+"""Benchmark decoding a polled device payload.
+
+Compares building the device from the payload on every poll with
+keeping the parsed device and only updating its status.
+
+Run from the repository root with ``python -m benchmarks.poll_decode``.
+"""
+from __future__ import annotations
+
+import copy
+import timeit
+import tracemalloc
+from typing import Any, Callable
+
+from aiolookin import Climate, Remote
+
+from lookin.coordinator import _update_status_from_payload
+
+POLLS = 20000
+FUNCTION_COUNTS = (5, 20, 50)
+
+
+def _payload(functions: int) -> dict[str, Any]:
+    """Return the payload of a remote with the given number of functions."""
+    return {
+        "Type": "01",
+        "Name": "TV",
+        "Updated": "1630000000",
+        "Status": "1000",
+        "Functions": [
+            {"Type": "single", "Name": f"function{idx}"} for idx in range(functions)
+        ],
+    }
+
+
+def _measure(
+    poll: Callable[[dict[str, Any]], Any], payloads: list[dict[str, Any]]
+) -> tuple[float, int]:
+    """Return the ns per poll and the bytes allocated per poll."""
+    seconds = min(
+        timeit.repeat(
+            lambda: [poll(payload) for payload in payloads], number=1, repeat=5
+        )
+    )
+    tracemalloc.start()
+    for payload in payloads:
+        poll(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds / len(payloads) * 1e9, peak
+
+
+def main() -> None:
+    """Run the benchmark."""
+    print(
+        f"{'device':>7} {'functions':>9} {'rebuild ns':>10} {'status ns':>9}"
+        f" {'rebuild peak B':>14} {'status peak B':>13}"
+    )
+    for name, cls, extra in (
+        ("remote", Remote, {}),
+        ("climate", Climate, {"Extra": "0001", "Type": "EF"}),
+    ):
+        for functions in FUNCTION_COUNTS:
+            payloads = []
+            for idx in range(POLLS):
+                payload = {**copy.deepcopy(_payload(functions)), **extra}
+                payload["Status"] = "1320" if idx % 2 else "0000"
+                payloads.append(payload)
+            device = cls(_data=payloads[0])
+            rebuild = _measure(lambda payload: cls(_data=payload), payloads)
+            status = _measure(
+                lambda payload: _update_status_from_payload(device, payload), payloads
+            )
+            print(
+                f"{name:>7} {functions:>9} {rebuild[0]:>10.0f} {status[0]:>9.0f}"
+                f" {rebuild[1]:>14} {status[1]:>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark UDP event dispatch against the number of subscribed entities.
+
+Run from the repository root with ``python -m benchmarks.udp_dispatch``.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import timeit
+from typing import Any, Callable
+from unittest.mock import MagicMock
+
+from aiolookin import LookinUDPSubscriptions
+from aiolookin.models import UDPCommand, UDPCommandType, UDPEvent
+
+from lookin.udp import LookinUDPDispatcher
+
+ENTITY_COUNTS = (10, 100, 1000, 5000)
+ENTITIES_PER_HUB = 50
+EVENTS = 20000
+BURST_SIZES = (1, 10, 100)
+STORM_UUIDS = 5
+
+
+def _subscribe(subs: LookinUDPSubscriptions, entities: int) -> list[UDPEvent]:
+    """Subscribe entities the way the platforms do and return events for them."""
+    events = []
+    for idx in range(entities):
+        device_id = f"98F3{idx // ENTITIES_PER_HUB:04X}"
+        uuid = f"{idx % ENTITIES_PER_HUB:04X}"
+        for command_type in (UDPCommandType.ir, UDPCommandType.data):
+            subs.subscribe_event(device_id, command_type, uuid, lambda event: None)
+        events.append(
+            UDPEvent(
+                device_id=device_id,
+                commnd=UDPCommand.updated,
+                type_code="87",
+                data_package=f"FE:{uuid}1000",
+            )
+        )
+    return events
+
+
+class _Loop:
+    """Run the callbacks scheduled with call_soon when asked to."""
+
+    def __init__(self) -> None:
+        self.ready: list[Callable[[], None]] = []
+
+    def call_soon(self, callback: Callable[[], None]) -> None:
+        self.ready.append(callback)
+
+    def run_ready(self) -> None:
+        ready, self.ready = self.ready, []
+        for callback in ready:
+            callback()
+
+
+async def main() -> None:
+    """Run the benchmark.
+
+    The loop iteration that delivers queued events runs after every event,
+    so every event is dispatched and none is superseded.
+    """
+    loop = _Loop()
+    hass = MagicMock(loop=loop)
+    print(f"{'entities':>8} {'aiolookin ns/event':>20} {'lookin ns/event':>16}")
+    for entities in ENTITY_COUNTS:
+        results = []
+        for subs in (LookinUDPSubscriptions(), LookinUDPDispatcher(hass)):
+            events = random.choices(_subscribe(subs, entities), k=EVENTS)
+
+            def _dispatch(subs: Any = subs, events: list[UDPEvent] = events) -> None:
+                for event in events:
+                    subs.notify_event(event)
+                    loop.run_ready()
+
+            seconds = min(timeit.repeat(_dispatch, number=1, repeat=5))
+            results.append(seconds / EVENTS * 1e9)
+        print(f"{entities:>8} {results[0]:>20.0f} {results[1]:>16.0f}")
+
+    # A lagging loop delivers several packets per iteration, an IR blaster
+    # storm repeats the same few uuids
+    print(f"\n{'burst':>8} {'aiolookin callbacks':>20} {'lookin callbacks':>16}")
+    for burst in BURST_SIZES:
+        calls = []
+        for subs in (LookinUDPSubscriptions(), LookinUDPDispatcher(hass)):
+            handled = 0
+
+            def _handler(event: UDPEvent) -> None:
+                nonlocal handled
+                handled += 1
+
+            events = random.choices(_subscribe(subs, STORM_UUIDS), k=EVENTS)
+            for idx in range(STORM_UUIDS):
+                subs.subscribe_event(
+                    events[0].device_id, UDPCommandType.ir, f"{idx:04X}", _handler
+                )
+            for idx in range(0, EVENTS, burst):
+                for event in events[idx : idx + burst]:
+                    subs.notify_event(event)
+                loop.run_ready()
+            calls.append(handled)
+        print(f"{burst:>8} {calls[0]:>20} {calls[1]:>16}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""Benchmark the per packet cost of UDP push against the number of hubs.
+
+Every hub broadcasts to the same port. With a socket per config entry
+every packet is parsed once per hub, with the shared listener it is
+parsed once and routed to the hub that sent it.
+
+Run from the repository root with ``python -m benchmarks.udp_hubs``.
+"""
+from __future__ import annotations
+
+import random
+import timeit
+from unittest.mock import MagicMock
+
+from aiolookin.models import UDPCommandType
+
+from lookin.udp import LookinUDPDispatcher, LookinUDPListener, LookinUDPProtocol
+
+HUB_COUNTS = (1, 2, 5, 10, 20)
+ENTITIES_PER_HUB = 10
+PACKETS = 20000
+
+
+def _listener(device_ids: list[str]) -> LookinUDPListener:
+    """Return a listener with entities subscribed the way the platforms do."""
+    listener = LookinUDPListener(MagicMock())
+    for device_id in device_ids:
+        dispatcher = LookinUDPDispatcher(MagicMock())
+        for idx in range(ENTITIES_PER_HUB):
+            for command_type in (UDPCommandType.ir, UDPCommandType.data):
+                dispatcher.subscribe_event(
+                    device_id, command_type, f"{idx:04X}", lambda event: None
+                )
+        listener._dispatchers[device_id] = dispatcher
+    return listener
+
+
+def main() -> None:
+    """Run the benchmark."""
+    print(f"{'hubs':>4} {'socket per hub ns/packet':>26} {'shared ns/packet':>18}")
+    for hubs in HUB_COUNTS:
+        device_ids = [f"98F3{idx:04X}" for idx in range(hubs)]
+        packets = [
+            f"LOOK.in:Updated!{device_id}:87:FE:{random.randrange(10):04X}1000".encode()
+            for device_id in random.choices(device_ids, k=PACKETS)
+        ]
+        per_hub = [
+            LookinUDPProtocol(_listener([device_id])) for device_id in device_ids
+        ]
+        shared = [LookinUDPProtocol(_listener(device_ids))]
+
+        results = []
+        for protocols in (per_hub, shared):
+            seconds = min(
+                timeit.repeat(
+                    lambda: [
+                        protocol.datagram_received(packet, ("", 0))
+                        for packet in packets
+                        for protocol in protocols
+                    ],
+                    number=1,
+                    repeat=5,
+                )
+            )
+            results.append(seconds / PACKETS * 1e9)
+        print(f"{hubs:>4} {results[0]:>26.0f} {results[1]:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
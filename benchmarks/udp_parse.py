@@ -0,0 +1,88 @@
+"""Benchmark parsing push datagrams into decoded values.
+
+Compares the aiolookin regex and str based parser, followed by the hex
+decoding the entities used to do on the event value, with the bytes
+based parser of the integration.
+
+Run from the repository root with ``python -m benchmarks.udp_parse``.
+"""
+from __future__ import annotations
+
+import random
+import timeit
+import tracemalloc
+from typing import Any, Callable
+
+from aiolookin.models import UDPCommandType
+from aiolookin.protocol import LookinUDPProtocol
+
+from lookin.udp import parse_datagram
+
+PACKETS = 50000
+DATAGRAMS = {
+    "ir": b"LOOK.in:Updated!98F33093:87:FE:FC124000",
+    "meteo": b"LOOK.in:Updated!98F33093:FE:00:00E201A8",
+    "data": b"LOOK.in:Updated!98F33093:data:FC12",
+}
+# The ids decoded by the listener, like the one Home Assistant runs
+INTERNED: dict[bytes, str] = {}
+
+
+def _aiolookin(data: bytes) -> Any:
+    """Parse a datagram and decode its value the way the entities did."""
+    if not (event := LookinUDPProtocol._parse_event(data)):
+        return None
+    if event.type == UDPCommandType.ir:
+        status = event.value
+        return event, status[0] == "1", status[2] == "0"
+    if event.type == UDPCommandType.meteo:
+        value = event.value
+        return event, int(value[:4], 16) / 10, int(value[-4:], 16) / 10
+    return event
+
+
+def _lookin(data: bytes) -> Any:
+    """Parse a datagram with the integration parser."""
+    if (event := parse_datagram(data, INTERNED)) is None:
+        return None
+    if event.type == UDPCommandType.ir:
+        assert event.nibbles is not None
+        return event, event.nibbles[0] == 1, event.nibbles[2] == 0
+    return event
+
+
+def _measure(parser: Callable[[bytes], Any], packets: list[bytes]) -> tuple[float, int]:
+    """Return the ns per packet and the bytes allocated for the packets."""
+    seconds = min(
+        timeit.repeat(
+            lambda: [parser(packet) for packet in packets], number=1, repeat=5
+        )
+    )
+    tracemalloc.start()
+    events = [parser(packet) for packet in packets]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return seconds / len(packets) * 1e9, peak // len(packets)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    print(
+        f"{'datagram':>8} {'aiolookin ns':>12} {'lookin ns':>10}"
+        f" {'aiolookin B':>12} {'lookin B':>9}"
+    )
+    mixes = {name: [packet] for name, packet in DATAGRAMS.items()}
+    mixes["mixed"] = list(DATAGRAMS.values())
+    for name, datagrams in mixes.items():
+        packets = [bytes(packet) for packet in random.choices(datagrams, k=PACKETS)]
+        old_ns, old_bytes = _measure(_aiolookin, packets)
+        new_ns, new_bytes = _measure(_lookin, packets)
+        print(
+            f"{name:>8} {old_ns:>12.0f} {new_ns:>10.0f}"
+            f" {old_bytes:>12} {new_bytes:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,136 +2,339 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable, Coroutine
-from datetime import timedelta
+from datetime import datetime
 import logging
 from typing import Any
 
 import aiohttp
-from aiolookin import (
-    Climate,
-    LookInHttpProtocol,
-    LookinUDPSubscriptions,
-    MeteoSensor,
-    Remote,
-    start_lookin_udp,
-)
-from aiolookin.models import UDPCommandType, UDPEvent
+from aiolookin import Device, MeteoSensor
+from aiolookin.models import UDPCommandType
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN, PLATFORMS, TYPE_TO_PLATFORM
-from .models import LookinData
+from .catalog import LookinCatalog
+from .const import DOMAIN, PLATFORMS
+from .coordinator import (
+    DATA_EVENT_COOLDOWN,
+    DEVICE_LIST_INTERVAL,
+    METEO_POLL_INTERVAL,
+    LookinHubCoordinator,
+)
+from .models import (
+    LookinData,
+    LookinDeviceRecord,
+    LookinPushStats,
+    MeteoReading,
+    index_devices,
+)
+from .protocol import LookinHubProtocol
+from .udp import LookinUDPDispatcher, LookinUDPEvent, async_register_udp_dispatcher
 
 LOGGER = logging.getLogger(__name__)
 
 
-def _async_climate_updater(
-    lookin_protocol: LookInHttpProtocol,
-    uuid: str,
-) -> Callable[[], Coroutine[None, Any, Remote]]:
-    """Create a function to capture the cell variable."""
+async def _async_revalidate_catalog(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    lookin_protocol: LookinHubProtocol,
+    catalog: LookinCatalog,
+) -> None:
+    """Check the cached catalog against the hub after a warm start.
+
+    The state of the devices is not polled here, it is reconciled by the
+    regular polls and pushes.
+    """
+    try:
+        lookin_device = await lookin_protocol.get_info()
+        devices = await lookin_protocol.get_devices()
+    except (asyncio.TimeoutError, aiohttp.ClientError) as ex:
+        LOGGER.debug("Failed to revalidate the catalog of %s: %s", entry.title, ex)
+        return
 
-    async def _async_update() -> Climate:
-        return await lookin_protocol.get_conditioner(uuid)
+    catalog.async_set_hub(lookin_device, devices)
+    await _async_reconcile_devices(hass, entry, devices)
+
+
+def _device_platforms(
+    platform_devices: dict[Platform, list[LookinDeviceRecord]]
+) -> dict[str, Platform]:
+    """Return the platform of every device by uuid."""
+    return {
+        record.uuid: platform
+        for platform, records in platform_devices.items()
+        for record in records
+    }
+
+
+async def _async_reconcile_devices(
+    hass: HomeAssistant, entry: ConfigEntry, devices: list[dict[str, Any]]
+) -> None:
+    """Add and remove the devices that changed on the hub.
+
+    Only the coordinators and the entities of the devices that were added
+    or removed are touched, everything else keeps running. A device whose
+    type changed is removed and added again.
+    """
+    if (lookin_data := hass.data.get(DOMAIN, {}).get(entry.entry_id)) is None:
+        return
+    platform_devices = index_devices(devices)
+    known = _device_platforms(lookin_data.platform_devices)
+    current = _device_platforms(platform_devices)
+    if known == current:
+        return
+    LOGGER.debug("The device list of %s changed", entry.title)
+    hub_coordinator = lookin_data.hub_coordinator
+    lookin_data.platform_devices.clear()
+    lookin_data.platform_devices.update(platform_devices)
+
+    device_registry = dr.async_get(hass)
+    for uuid, platform in known.items():
+        if current.get(uuid) == platform:
+            continue
+        hub_coordinator.async_remove_device(uuid)
+        # Unlinking the device from the entry removes the entities of the
+        # entry, uuids are only unique per hub so the device may be shared
+        if device := device_registry.async_get_device({(DOMAIN, uuid)}):
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry.entry_id
+            )
 
-    return _async_update
+    added = [uuid for uuid, platform in current.items() if known.get(uuid) != platform]
+    for uuid in added:
+        hub_coordinator.async_add_device(uuid, current[uuid])
 
+    # The entities of the added devices are created by their platform once
+    # they are fetched, set up the platforms that had no devices before
+    if new_platforms := [
+        platform
+        for platform in _platforms_for_devices(
+            lookin_data.lookin_device, platform_devices
+        )
+        if platform not in lookin_data.platforms
+    ]:
+        lookin_data.platforms.extend(new_platforms)
+        await asyncio.gather(
+            *(
+                hass.config_entries.async_forward_entry_setup(entry, platform)
+                for platform in new_platforms
+            )
+        )
 
-def _async_remote_updater(
-    lookin_protocol: LookInHttpProtocol,
-    uuid: str,
-) -> Callable[[], Coroutine[None, Any, Remote]]:
-    """Create a function to capture the cell variable."""
+    await asyncio.gather(
+        *(hub_coordinator.async_fetch_new_device(uuid) for uuid in added)
+    )
 
-    async def _async_update() -> Remote:
-        return await lookin_protocol.get_remote(uuid)
 
-    return _async_update
+def _platforms_for_devices(
+    lookin_device: Device, platform_devices: dict[Platform, list[LookinDeviceRecord]]
+) -> list[Platform]:
+    """Return the platforms that have entities for the devices of a hub."""
+    needed = set(platform_devices)
+    if lookin_device.model >= 2:
+        # Only the Remote2 has the temperature and humidity sensor
+        needed.add(Platform.SENSOR)
+    return [platform for platform in PLATFORMS if platform in needed]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up lookin from a config entry."""
     host = entry.data[CONF_HOST]
-    lookin_protocol = LookInHttpProtocol(
-        api_uri=f"http://{host}", session=async_get_clientsession(hass)
-    )
+    lookin_protocol = LookinHubProtocol(api_uri=f"http://{host}")
 
-    try:
-        lookin_device = await lookin_protocol.get_info()
-        devices = await lookin_protocol.get_devices()
-    except (asyncio.TimeoutError, aiohttp.ClientError) as ex:
-        raise ConfigEntryNotReady from ex
+    @callback
+    def _async_close_protocol() -> None:
+        hass.async_create_task(lookin_protocol.async_close())
+
+    entry.async_on_unload(_async_close_protocol)
+
+    catalog = LookinCatalog(hass, entry.entry_id)
+    if warm_start := await catalog.async_load():
+        lookin_device = catalog.lookin_device
+        devices = catalog.devices
+    else:
+        try:
+            lookin_device = await lookin_protocol.get_info()
+            devices = await lookin_protocol.get_devices()
+        except (asyncio.TimeoutError, aiohttp.ClientError) as ex:
+            raise ConfigEntryNotReady from ex
+        catalog.async_set_hub(lookin_device, devices)
+
+    async def _async_fetch_meteo() -> MeteoSensor:
+        """Fetch the meteo sensor and keep the reading for restarts."""
+        meteo = await lookin_protocol.get_meteo_sensor()
+        catalog.async_set_meteo(meteo)
+        return meteo
 
     meteo_coordinator: DataUpdateCoordinator = DataUpdateCoordinator(
         hass,
         LOGGER,
         name=entry.title,
-        update_method=lookin_protocol.get_meteo_sensor,
-        update_interval=timedelta(
-            minutes=5
-        ),  # Updates are pushed (fallback is polling)
+        update_method=_async_fetch_meteo,
+        update_interval=METEO_POLL_INTERVAL,
     )
-    await meteo_coordinator.async_config_entry_first_refresh()
+    pending_coordinators: list[DataUpdateCoordinator] = []
+    if (restored_meteo := catalog.meteo_sensor) is not None:
+        meteo_coordinator.async_set_updated_data(restored_meteo)
+    else:
+        pending_coordinators.append(meteo_coordinator)
 
-    device_coordinators: dict[str, DataUpdateCoordinator] = {}
-    for remote in devices:
-        if (platform := TYPE_TO_PLATFORM.get(remote["Type"])) is None:
-            continue
-        uuid = remote["UUID"]
-        if platform == Platform.CLIMATE:
-            updater = _async_climate_updater(lookin_protocol, uuid)
-        else:
-            updater = _async_remote_updater(lookin_protocol, uuid)
-        coordinator = DataUpdateCoordinator(
-            hass,
-            LOGGER,
-            name=f"{entry.title} {uuid}",
-            update_method=updater,
-            update_interval=timedelta(
-                seconds=60
-            ),  # Updates are pushed (fallback is polling)
-        )
-        await coordinator.async_config_entry_first_refresh()
-        device_coordinators[uuid] = coordinator
+    hub_coordinator = LookinHubCoordinator(
+        hass, entry.entry_id, entry.title, lookin_protocol, catalog, meteo_coordinator
+    )
 
     @callback
-    def _async_meteo_push_update(event: UDPEvent) -> None:
-        """Process an update pushed via UDP."""
+    def _async_shutdown_hub_coordinator() -> None:
+        hass.async_create_task(hub_coordinator.async_shutdown())
+
+    entry.async_on_unload(_async_shutdown_hub_coordinator)
+
+    platform_devices = index_devices(devices)
+    for platform, records in platform_devices.items():
+        for record in records:
+            coordinator = hub_coordinator.async_add_device(record.uuid, platform)
+            if coordinator.data is None:
+                pending_coordinators.append(coordinator)
+
+    # Refresh all devices in parallel so setup time is bound by the slowest
+    # device instead of the sum of all of them. Devices and meteo readings
+    # restored from the catalog start with their last known state and are
+    # reconciled by the regular polls and pushes instead. A device that does
+    # not answer does not hold up the rest of the hub, it is retried in the
+    # background and its entity is added once it has data.
+    await asyncio.gather(
+        *(coordinator.async_refresh() for coordinator in pending_coordinators)
+    )
+    for uuid, coordinator in hub_coordinator.device_coordinators.items():
+        if coordinator.data is None:
+            hub_coordinator.async_retry_device(uuid)
+    hub_coordinator.async_start_polling()
+
+    push_stats = LookinPushStats()
+
+    @callback
+    def _async_meteo_push_update(event: LookinUDPEvent) -> None:
+        """Process an update pushed via UDP.
+
+        The reading is decoded once with the datagram, the sensors and the
+        climate entities of the hub all get it from the meteo coordinator.
+        """
         LOGGER.debug("Processing push message for meteo sensor: %s", event)
-        meteo: MeteoSensor = meteo_coordinator.data
-        meteo.update_from_value(event.value)
+        hub_coordinator.async_push_received(None)
+        if event.temperature is None or event.humidity is None:
+            return
+        reading = MeteoReading(event.temperature, event.humidity)
+        meteo: MeteoSensor | None = meteo_coordinator.data
+        if meteo is None:
+            # The sensor was not fetched yet, there is no reading to update
+            hass.async_create_task(meteo_coordinator.async_request_refresh())
+            return
+        if reading == (meteo.temperature, meteo.humidity):
+            push_stats.state_writes_suppressed += 1
+            return
+        push_stats.state_writes += 1
+        meteo.temperature, meteo.humidity = reading
+        catalog.async_set_meteo(meteo)
         meteo_coordinator.async_set_updated_data(meteo)
 
-    lookin_udp_subs = LookinUDPSubscriptions()
+    lookin_udp_subs = LookinUDPDispatcher(hass)
     entry.async_on_unload(
         lookin_udp_subs.subscribe_event(
             lookin_device.id, UDPCommandType.meteo, None, _async_meteo_push_update
         )
     )
 
-    entry.async_on_unload(await start_lookin_udp(lookin_udp_subs, lookin_device.id))
+    entry.async_on_unload(
+        await async_register_udp_dispatcher(hass, lookin_device.id, lookin_udp_subs)
+    )
 
+    platforms = _platforms_for_devices(lookin_device, platform_devices)
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = LookinData(
         lookin_udp_subs=lookin_udp_subs,
         lookin_device=lookin_device,
         meteo_coordinator=meteo_coordinator,
-        devices=devices,
+        platform_devices=platform_devices,
         lookin_protocol=lookin_protocol,
-        device_coordinators=device_coordinators,
+        device_coordinators=hub_coordinator.device_coordinators,
+        hub_coordinator=hub_coordinator,
+        platforms=platforms,
+        push_stats=push_stats,
     )
 
-    hass.config_entries.async_setup_platforms(entry, PLATFORMS)
+    hass.config_entries.async_setup_platforms(entry, platforms)
+
+    async def _async_check_device_list() -> None:
+        """Pick up remotes that were added or removed in the app."""
+        try:
+            devices = await lookin_protocol.get_devices()
+        except (asyncio.TimeoutError, aiohttp.ClientError) as ex:
+            LOGGER.debug("Failed to check the devices of %s: %s", entry.title, ex)
+            return
+        catalog.async_set_devices(devices)
+        await _async_reconcile_devices(hass, entry, devices)
+
+    device_list_debouncer = Debouncer(
+        hass,
+        LOGGER,
+        cooldown=DATA_EVENT_COOLDOWN,
+        immediate=False,
+        function=_async_check_device_list,
+    )
+    entry.async_on_unload(device_list_debouncer.async_cancel)
+
+    async def _async_unknown_device_data(event: LookinUDPEvent) -> None:
+        """Check the device list when a remote without an entity changed."""
+        LOGGER.debug("Processing push message for an unknown device: %s", event)
+        if event.uuid is None:
+            return
+        if event.uuid in hub_coordinator.device_coordinators:
+            # Known but not fetched yet, its retry is done right away
+            await hub_coordinator.async_request_device_refresh(event.uuid)
+            return
+        await device_list_debouncer.async_call()
+
+    async def _async_device_list_interval(_now: datetime) -> None:
+        await device_list_debouncer.async_call()
+
+    entry.async_on_unload(
+        lookin_udp_subs.subscribe_event(
+            lookin_device.id, UDPCommandType.data, None, _async_unknown_device_data
+        )
+    )
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_device_list_interval, DEVICE_LIST_INTERVAL
+        )
+    )
+
+    if warm_start:
+        hass.async_create_task(
+            _async_revalidate_catalog(
+                hass,
+                entry,
+                lookin_protocol,
+                catalog,
+            )
+        )
 
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+    lookin_data: LookinData = hass.data[DOMAIN][entry.entry_id]
+    if unload_ok := await hass.config_entries.async_unload_platforms(
+        entry, lookin_data.platforms
+    ):
         hass.data[DOMAIN].pop(entry.entry_id)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached catalog when the config entry is removed."""
+    await LookinCatalog(hass, entry.entry_id).async_remove()
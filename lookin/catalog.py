@@ -0,0 +1,152 @@
+"""The lookin integration device catalog cache."""
+from __future__ import annotations
+
+from typing import Any, Final
+
+from aiolookin import Device, MeteoSensor
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION: Final = 1
+SAVE_DELAY: Final = 30
+
+
+def _device_to_payload(device: Device) -> dict[str, Any]:
+    """Convert a lookin device back into the payload returned by the hub."""
+    return {
+        "Type": device.type,
+        "MRDC": f"{device.model:02X}",
+        "Status": device.status,
+        "ID": device.id,
+        "Name": device.name,
+        "Time": device.time,
+        "Timezone": device.timezone,
+        "PowerMode": device.powermode,
+        "CurrentVoltage": device.currentvoltage,
+        "Firmware": device.firmware,
+        "Temperature": device.temperature,
+        "HomeKit": device.homekit,
+        "EcoMode": "on" if device.ecomode else "off",
+        "SensorMode": device.sensormode,
+    }
+
+
+def _meteo_to_payload(meteo: MeteoSensor) -> dict[str, Any]:
+    """Convert a meteo sensor reading back into the payload returned by the hub."""
+    return {
+        "Humidity": str(meteo.humidity),
+        "Pressure": str(meteo.pressure),
+        "Temperature": str(meteo.temperature),
+        "Updated": str(meteo.updated),
+    }
+
+
+class LookinCatalog:
+    """A snapshot of the hub catalog that survives restarts.
+
+    The snapshot holds the hub info, the device list and the payload
+    of every remote so entities can be created without waiting for
+    the hub to answer. Statuses and meteo readings pushed via UDP are
+    written back into it so entities start with their last known state.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Init the catalog."""
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self.device: dict[str, Any] | None = None
+        self.devices: list[dict[str, Any]] = []
+        self.remotes: dict[str, dict[str, Any]] = {}
+        self.meteo: dict[str, Any] | None = None
+        self._save_scheduled = False
+
+    @property
+    def lookin_device(self) -> Device:
+        """Return the cached lookin device."""
+        assert self.device is not None
+        return Device(_data=self.device)
+
+    @property
+    def meteo_sensor(self) -> MeteoSensor | None:
+        """Return the cached meteo sensor reading."""
+        return None if self.meteo is None else MeteoSensor(_data=self.meteo)
+
+    async def async_load(self) -> bool:
+        """Load the snapshot, returns False if there is none."""
+        if not (data := await self._store.async_load()):
+            return False
+        self.device = data["device"]
+        self.devices = data["devices"]
+        self.remotes = data["remotes"]
+        self.meteo = data.get("meteo")
+        return True
+
+    async def async_remove(self) -> None:
+        """Remove the snapshot from disk."""
+        await self._store.async_remove()
+
+    @callback
+    def async_set_hub(self, device: Device, devices: list[dict[str, Any]]) -> None:
+        """Store the hub info and the device list."""
+        self.device = _device_to_payload(device)
+        self.async_set_devices(devices)
+
+    @callback
+    def async_set_devices(self, devices: list[dict[str, Any]]) -> None:
+        """Store the device list, drops the payloads of removed remotes."""
+        self.devices = devices
+        uuids = {remote["UUID"] for remote in devices}
+        self.remotes = {
+            uuid: payload for uuid, payload in self.remotes.items() if uuid in uuids
+        }
+        self._async_schedule_save()
+
+    @callback
+    def async_set_remote(self, uuid: str, payload: dict[str, Any]) -> None:
+        """Store the payload of a remote."""
+        if self.remotes.get(uuid) == payload:
+            return
+        self.remotes[uuid] = payload
+        self._async_schedule_save()
+
+    @callback
+    def async_set_status(self, uuid: str, status: str) -> None:
+        """Store the last known status of a remote."""
+        if (payload := self.remotes.get(uuid)) is None or payload.get(
+            "Status"
+        ) == status:
+            return
+        self.remotes[uuid] = {**payload, "Status": status}
+        self._async_schedule_save()
+
+    @callback
+    def async_set_meteo(self, meteo: MeteoSensor) -> None:
+        """Store the last meteo sensor reading."""
+        if (payload := _meteo_to_payload(meteo)) == self.meteo:
+            return
+        self.meteo = payload
+        self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the snapshot after a delay to batch writes.
+
+        The delay is not pushed back by later changes, so a steady stream
+        of pushed updates is still saved every SAVE_DELAY seconds.
+        """
+        if self._save_scheduled:
+            return
+        self._save_scheduled = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to save."""
+        self._save_scheduled = False
+        return {
+            "device": self.device,
+            "devices": self.devices,
+            "remotes": self.remotes,
+            "meteo": self.meteo,
+        }
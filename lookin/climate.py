@@ -1,11 +1,13 @@
 """The lookin integration climate platform."""
 from __future__ import annotations
 
+from datetime import datetime
 import logging
 from typing import Any, Final, cast
 
 from aiolookin import Climate, MeteoSensor
-from aiolookin.models import UDPCommandType, UDPEvent
+from aiolookin.const import TEMP_OFFSET
+from aiolookin.models import UDPCommandType
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import (
     ATTR_HVAC_MODE,
@@ -32,13 +34,15 @@ from homeassistant.const import (
     TEMP_CELSIUS,
     Platform,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN, TYPE_TO_PLATFORM
-from .entity import LookinCoordinatorEntity
-from .models import LookinData
+from .const import DOMAIN
+from .entity import LookinCoordinatorEntity, async_add_device_entities
+from .models import LookinData, LookinDeviceRecord
+from .udp import STATUS_NIBBLES, LookinUDPEvent, StatusTable
 
 SUPPORT_FLAGS: int = SUPPORT_TARGET_TEMPERATURE | SUPPORT_FAN_MODE | SUPPORT_SWING_MODE
 
@@ -64,8 +68,32 @@ HASS_TO_LOOKIN_SWING_MODE: dict[str, int] = {
 }
 
 
+def _decode_status(status: int) -> tuple[str, int, str, str] | None:
+    """Decode the status of a conditioner into its hvac, temperature, fan and swing.
+
+    Returns None if a mode is out of range.
+    """
+    hvac_mode, temperature, fan_mode, swing_mode = STATUS_NIBBLES[status]
+    if (
+        hvac_mode >= len(LOOKIN_HVAC_MODE_IDX_TO_HASS)
+        or fan_mode >= len(LOOKIN_FAN_MODE_IDX_TO_HASS)
+        or swing_mode >= len(LOOKIN_SWING_MODE_IDX_TO_HASS)
+    ):
+        return None
+    return (
+        LOOKIN_HVAC_MODE_IDX_TO_HASS[hvac_mode],
+        temperature + TEMP_OFFSET,
+        LOOKIN_FAN_MODE_IDX_TO_HASS[fan_mode],
+        LOOKIN_SWING_MODE_IDX_TO_HASS[swing_mode],
+    )
+
+
+_STATUS_TABLE: Final = StatusTable(_decode_status)
+
 MIN_TEMP: Final = 16
 MAX_TEMP: Final = 30
+# Changes made within this many seconds are sent in one transmission
+COALESCE_DELAY: Final = 0.5
 LOGGER = logging.getLogger(__name__)
 
 
@@ -76,24 +104,20 @@ async def async_setup_entry(
 ) -> None:
     """Set up the climate platform for lookin from a config entry."""
     lookin_data: LookinData = hass.data[DOMAIN][config_entry.entry_id]
-    entities = []
-
-    for remote in lookin_data.devices:
-        if TYPE_TO_PLATFORM.get(remote["Type"]) != Platform.CLIMATE:
-            continue
-        uuid = remote["UUID"]
-        coordinator = lookin_data.device_coordinators[uuid]
-        device: Climate = coordinator.data
-        entities.append(
-            ConditionerEntity(
-                uuid=uuid,
-                device=device,
-                lookin_data=lookin_data,
-                coordinator=coordinator,
-            )
+
+    def _create_entity(
+        record: LookinDeviceRecord, coordinator: DataUpdateCoordinator
+    ) -> ConditionerEntity:
+        return ConditionerEntity(
+            uuid=record.uuid,
+            device=coordinator.data,
+            lookin_data=lookin_data,
+            coordinator=coordinator,
         )
 
-    async_add_entities(entities)
+    async_add_device_entities(
+        hass, config_entry, Platform.CLIMATE, async_add_entities, _create_entity
+    )
 
 
 class ConditionerEntity(LookinCoordinatorEntity, ClimateEntity):
@@ -118,6 +142,8 @@ class ConditionerEntity(LookinCoordinatorEntity, ClimateEntity):
     ) -> None:
         """Init the ConditionerEntity."""
         super().__init__(coordinator, uuid, device, lookin_data)
+        self._command_stats = lookin_data.command_stats
+        self._cancel_transmission: CALLBACK_TYPE | None = None
         self._async_update_from_data()
 
     @property
@@ -150,8 +176,8 @@ class ConditionerEntity(LookinCoordinatorEntity, ClimateEntity):
             # or cool otherwise we set auto since we don't have a way to make
             # an educated guess.
             #
-            meteo_data: MeteoSensor = self._meteo_coordinator.data
-            current_temp = meteo_data.temperature
+            meteo_data: MeteoSensor | None = self._meteo_coordinator.data
+            current_temp = None if meteo_data is None else meteo_data.temperature
             if not current_temp:
                 self._climate.hvac_mode = lookin_index.index(HVAC_MODE_AUTO)
             elif current_temp >= self._climate.temp_celsius:
@@ -175,26 +201,72 @@ class ConditionerEntity(LookinCoordinatorEntity, ClimateEntity):
         await self._async_update_conditioner()
 
     async def _async_update_conditioner(self) -> None:
-        """Update the conditioner state from the climate data."""
+        """Update the conditioner state from the climate data.
+
+        The new state is shown right away and sent COALESCE_DELAY later, so
+        changes made together, like a scene setting the mode, the temperature
+        and the fan mode, go out in a single transmission.
+        """
+        self._command_stats.conditioner_requests += 1
+        if self._cancel_transmission is None:
+            self._cancel_transmission = async_call_later(
+                self.hass, COALESCE_DELAY, self._async_transmit
+            )
+        self._hub_coordinator.async_set_device_status(
+            self._uuid, self._climate.to_status
+        )
         self.coordinator.async_set_updated_data(self._climate)
-        await self._lookin_protocol.update_conditioner(climate=self._climate)
+
+    async def _async_transmit(self, _now: datetime) -> None:
+        """Send the pending changes to the conditioner."""
+        self._cancel_transmission = None
+        try:
+            await self._lookin_protocol.update_conditioner(climate=self._climate)
+        except Exception as ex:  # pylint: disable=broad-except
+            LOGGER.error("Failed to update %s: %s", self.entity_id, ex)
+            # The state shown is not the one of the unit, fetch it again
+            await self._hub_coordinator.async_request_device_refresh(self._uuid)
+            return
+        self._command_stats.conditioner_transmissions += 1
 
     def _async_update_from_data(self) -> None:
         """Update attrs from data."""
-        meteo_data: MeteoSensor = self._meteo_coordinator.data
+        meteo_data: MeteoSensor | None = self._meteo_coordinator.data
+        if meteo_data is not None:
+            self._attr_current_temperature = meteo_data.temperature
+            self._attr_current_humidity = int(meteo_data.humidity)
+        climate = self._climate
+        decoded = _STATUS_TABLE[
+            climate.hvac_mode << 12
+            | climate.temperature << 8
+            | climate.fan_mode << 4
+            | climate.swing_mode
+        ]
+        if decoded is None:
+            LOGGER.debug("Ignoring unknown status of %s", self.entity_id)
+            return
+        (
+            self._attr_hvac_mode,
+            self._attr_target_temperature,
+            self._attr_fan_mode,
+            self._attr_swing_mode,
+        ) = decoded
 
+    @callback
+    def _async_meteo_updated(self) -> None:
+        """Update temperature and humidity from the meteo coordinator."""
+        meteo_data: MeteoSensor | None = self._meteo_coordinator.data
+        if meteo_data is None or (
+            self._attr_current_temperature,
+            self._attr_current_humidity,
+        ) == (
+            meteo_data.temperature,
+            int(meteo_data.humidity),
+        ):
+            return
         self._attr_current_temperature = meteo_data.temperature
         self._attr_current_humidity = int(meteo_data.humidity)
-        self._attr_target_temperature = self._climate.temp_celsius
-        self._attr_fan_mode = LOOKIN_FAN_MODE_IDX_TO_HASS[self._climate.fan_mode]
-        self._attr_swing_mode = LOOKIN_SWING_MODE_IDX_TO_HASS[self._climate.swing_mode]
-        self._attr_hvac_mode = LOOKIN_HVAC_MODE_IDX_TO_HASS[self._climate.hvac_mode]
-
-    @callback
-    def _async_update_meteo_from_value(self, event: UDPEvent) -> None:
-        """Update temperature and humidity from UDP event."""
-        self._attr_current_temperature = float(int(event.value[:4], 16)) / 10
-        self._attr_current_humidity = float(int(event.value[-4:], 16)) / 10
+        self.async_write_ha_state()
 
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -203,11 +275,45 @@ class ConditionerEntity(LookinCoordinatorEntity, ClimateEntity):
         super()._handle_coordinator_update()
 
     @callback
-    def _async_push_update(self, event: UDPEvent) -> None:
+    def _async_push_update(self, event: LookinUDPEvent) -> None:
         """Process an update pushed via UDP."""
         LOGGER.debug("Processing push message for %s: %s", self.entity_id, event)
-        self._climate.update_from_status(event.value)
-        self.coordinator.async_set_updated_data(self._climate)
+        self._hub_coordinator.async_push_received(self._uuid)
+        if (
+            event.status is None
+            or event.nibbles is None
+            or _STATUS_TABLE[event.status] is None
+        ):
+            LOGGER.debug("Ignoring unknown status pushed for %s", self.entity_id)
+            return
+        climate = self._climate
+        previous = (
+            climate.hvac_mode,
+            climate.temperature,
+            climate.fan_mode,
+            climate.swing_mode,
+        )
+        if event.status == 0:
+            # Device is off, keep the temp/fan/swing settings
+            climate.hvac_mode = 0
+        else:
+            (
+                climate.hvac_mode,
+                climate.temperature,
+                climate.fan_mode,
+                climate.swing_mode,
+            ) = event.nibbles
+        if self.coordinator.last_update_success and previous == (
+            climate.hvac_mode,
+            climate.temperature,
+            climate.fan_mode,
+            climate.swing_mode,
+        ):
+            self._push_stats.state_writes_suppressed += 1
+            return
+        self._push_stats.state_writes += 1
+        self._hub_coordinator.async_set_device_status(self._uuid, climate.to_status)
+        self.coordinator.async_set_updated_data(climate)
 
     async def async_added_to_hass(self) -> None:
         """Call when the entity is added to hass."""
@@ -220,11 +326,13 @@ class ConditionerEntity(LookinCoordinatorEntity, ClimateEntity):
             )
         )
         self.async_on_remove(
-            self._lookin_udp_subs.subscribe_event(
-                self._lookin_device.id,
-                UDPCommandType.meteo,
-                None,
-                self._async_update_meteo_from_value,
-            )
+            self._meteo_coordinator.async_add_listener(self._async_meteo_updated)
         )
         return await super().async_added_to_hass()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop the pending transmission when the entity is removed."""
+        if self._cancel_transmission is not None:
+            self._cancel_transmission()
+            self._cancel_transmission = None
+        await super().async_will_remove_from_hass()
@@ -18,10 +18,23 @@ PLATFORMS: Final = [
     Platform.VACUUM,
 ]
 
+# The hub is a single core ESP32, keep the number of parallel requests low
+HUB_REQUEST_CONCURRENCY: Final = 2
+# Sent with the uuid of a device once it has data and can get an entity
+SIGNAL_DEVICE_READY: Final = "lookin_device_ready_{}_{}"
+
+# Reuse connections to the hub for bursts of requests, but close them
+# before the hub drops idle sockets on its side
+HUB_KEEPALIVE_TIMEOUT: Final = 10
 
 TYPE_TO_PLATFORM = {
+    "00": Platform.REMOTE,
     "01": Platform.MEDIA_PLAYER,
     "02": Platform.MEDIA_PLAYER,
     "03": Platform.LIGHT,
+    "04": Platform.FAN,
+    "05": Platform.FAN,
+    "06": Platform.VACUUM,
+    "07": Platform.FAN,
     "EF": Platform.CLIMATE,
 }
@@ -0,0 +1,421 @@
+"""The lookin integration coordinators."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from functools import partial
+import logging
+import time
+from typing import Any, Final
+
+from aiolookin import Climate, Remote
+from aiolookin.const import STATUS_OFF
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .catalog import LookinCatalog
+from .const import SIGNAL_DEVICE_READY
+from .protocol import LookinHubProtocol
+
+LOGGER = logging.getLogger(__name__)
+
+# Updates are pushed, polling is a fallback that backs off while push works
+DEVICE_POLL_INTERVAL: Final = timedelta(seconds=60)
+METEO_POLL_INTERVAL: Final = timedelta(minutes=5)
+MAX_POLL_INTERVAL: Final = timedelta(minutes=30)
+PUSH_STALE_AFTER: Final = timedelta(minutes=10)
+# Editing a remote in the app makes the hub send a burst of data events
+DATA_EVENT_COOLDOWN: Final = 2.0
+# Remotes added or removed in the app are picked up by a cheap device list check
+DEVICE_LIST_INTERVAL: Final = timedelta(minutes=10)
+# Devices that could not be fetched during setup are retried with backoff
+DEVICE_RETRY_INTERVAL: Final = timedelta(seconds=15)
+MAX_DEVICE_RETRY_INTERVAL: Final = timedelta(minutes=10)
+
+
+def _update_status_from_payload(device: Remote, payload: dict[str, Any]) -> bool:
+    """Update the status of a device in place, returns if it changed."""
+    status = payload.get("Status")
+    laststatus = payload.get("LastStatus")
+    if (device.status, device.laststatus) == (status, laststatus):
+        return False
+    device.status = status
+    device.laststatus = laststatus
+    if isinstance(device, Climate):
+        if status is None:
+            # Device is off, but we still want to keep the temp/fan/swing settings
+            status = STATUS_OFF if laststatus is None else f"0{laststatus[1:]}"
+        device.update_from_status(status)
+    return True
+
+
+class LookinHubCoordinator(DataUpdateCoordinator):
+    """Poll all devices of a hub in a single batch.
+
+    Every device gets a coordinator without a timer of its own that the
+    entities listen to. The hub coordinator refreshes all devices at once
+    and only notifies the device coordinators whose state changed.
+
+    The poll interval of the hub and of the meteo coordinator doubles
+    after every poll while UDP push is healthy, up to MAX_POLL_INTERVAL,
+    and drops back as soon as push goes quiet or the hub comes back
+    after an error. Devices that pushed an update within the current
+    interval are skipped.
+
+    The hub coordinator has no entities listening to it, its polls are
+    scheduled from async_start_polling until async_shutdown and every
+    refresh schedules the next one with the current interval.
+
+    Polls keep the name and the functions of a device that were parsed
+    before and only update its status, unless the hub reports that the
+    device was edited. Data events rebuild the device from scratch.
+
+    Devices that could not be fetched during setup, or were added to the
+    hub later, are left out of the polls and retried with backoff instead.
+    SIGNAL_DEVICE_READY is sent once they have data so the platform can
+    add their entity.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        name: str,
+        lookin_protocol: LookinHubProtocol,
+        catalog: LookinCatalog,
+        meteo_coordinator: DataUpdateCoordinator,
+    ) -> None:
+        """Init the hub coordinator."""
+        super().__init__(hass, LOGGER, name=name, update_interval=DEVICE_POLL_INTERVAL)
+        self._entry_id = entry_id
+        self._lookin_protocol = lookin_protocol
+        self._catalog = catalog
+        self._meteo_coordinator = meteo_coordinator
+        self._last_push: float | None = None
+        self._last_device_push: dict[str, float] = {}
+        self._unsub_push_watchdog: CALLBACK_TYPE | None = None
+        self._unsub_poll: CALLBACK_TYPE | None = None
+        self._device_debouncers: dict[str, Debouncer] = {}
+        # When the devices last changed, their refresh must not share a poll
+        # that was sent before that
+        self._device_changed: dict[str, float] = {}
+        self.device_polls = 0
+        self.device_polls_skipped = 0
+        self.data_events = 0
+        self.data_event_refreshes = 0
+        self._climate_uuids: set[str] = set()
+        self._platforms: dict[str, Platform] = {}
+        self._device_retries: dict[str, CALLBACK_TYPE | None] = {}
+        self._shut_down = False
+        self.device_coordinators: dict[str, DataUpdateCoordinator] = {}
+        self.data: dict[str, Remote] = {}
+
+    @callback
+    def async_add_device(self, uuid: str, platform: Platform) -> DataUpdateCoordinator:
+        """Add a device and return the coordinator for it.
+
+        The coordinator has data right away when the device is in the catalog.
+        """
+        self._platforms[uuid] = platform
+        if platform == Platform.CLIMATE:
+            self._climate_uuids.add(uuid)
+        coordinator = DataUpdateCoordinator(
+            self.hass,
+            LOGGER,
+            name=f"{self.name} {uuid}",
+            update_method=partial(self._async_fetch_device, uuid),
+        )
+        if (payload := self._catalog.remotes.get(uuid)) is not None:
+            coordinator.async_set_updated_data(self._device_from_payload(uuid, payload))
+            self.data[uuid] = coordinator.data
+        self.device_coordinators[uuid] = coordinator
+        return coordinator
+
+    @callback
+    def async_remove_device(self, uuid: str) -> None:
+        """Remove a device that is no longer on the hub."""
+        del self.device_coordinators[uuid]
+        del self._platforms[uuid]
+        self.data.pop(uuid, None)
+        self._climate_uuids.discard(uuid)
+        self._last_device_push.pop(uuid, None)
+        self._device_changed.pop(uuid, None)
+        if (debouncer := self._device_debouncers.pop(uuid, None)) is not None:
+            debouncer.async_cancel()
+        if (cancel_retry := self._device_retries.pop(uuid, None)) is not None:
+            cancel_retry()
+
+    async def async_fetch_new_device(self, uuid: str) -> None:
+        """Fetch a device that was added to the hub after setup."""
+        if self._shut_down:
+            return
+        self._device_retries[uuid] = None
+        await self._async_retry_device(uuid, DEVICE_RETRY_INTERVAL, None)
+
+    @callback
+    def async_retry_device(
+        self, uuid: str, interval: timedelta = DEVICE_RETRY_INTERVAL
+    ) -> None:
+        """Fetch a device that has no data yet after the interval."""
+        if self._shut_down:
+            return
+        LOGGER.debug(
+            "Retrying %s %s in %s seconds", self.name, uuid, interval.total_seconds()
+        )
+        self._device_retries[uuid] = async_call_later(
+            self.hass, interval, partial(self._async_retry_device, uuid, interval)
+        )
+
+    async def _async_retry_device(
+        self, uuid: str, interval: timedelta, _now: Any
+    ) -> None:
+        """Fetch a device that has no data yet."""
+        self._device_retries[uuid] = None
+        if (coordinator := self.device_coordinators.get(uuid)) is None:
+            return
+        await coordinator.async_refresh()
+        if uuid not in self._device_retries:
+            # Removed from the hub or shut down while it was fetched
+            return
+        if coordinator.data is None:
+            self.async_retry_device(uuid, min(interval * 2, MAX_DEVICE_RETRY_INTERVAL))
+            return
+        del self._device_retries[uuid]
+        async_dispatcher_send(
+            self.hass,
+            SIGNAL_DEVICE_READY.format(self._entry_id, self._platforms[uuid]),
+            uuid,
+        )
+
+    @property
+    def push_healthy(self) -> bool:
+        """Return if the hub pushed anything recently."""
+        return (
+            self._last_push is not None
+            and time.monotonic() - self._last_push < PUSH_STALE_AFTER.total_seconds()
+        )
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the polling state for diagnostics."""
+        assert self.update_interval is not None
+        assert self._meteo_coordinator.update_interval is not None
+        return {
+            "update_interval": self.update_interval.total_seconds(),
+            "meteo_update_interval": (
+                self._meteo_coordinator.update_interval.total_seconds()
+            ),
+            "push_healthy": self.push_healthy,
+            "last_push_age": (
+                None
+                if self._last_push is None
+                else round(time.monotonic() - self._last_push, 1)
+            ),
+            "device_polls": self.device_polls,
+            "device_polls_skipped": self.device_polls_skipped,
+            "data_events": self.data_events,
+            "data_event_refreshes": self.data_event_refreshes,
+            "devices_pending": sorted(self._device_retries),
+        }
+
+    @callback
+    def async_set_device_status(self, uuid: str, status: str) -> None:
+        """Keep the status a device got from a push or a command for restarts."""
+        self._catalog.async_set_status(uuid, status)
+
+    @callback
+    def async_push_received(self, uuid: str | None) -> None:
+        """Record an update pushed via UDP for the hub or one of its devices."""
+        self._last_push = time.monotonic()
+        if uuid is not None:
+            self._last_device_push[uuid] = self._last_push
+        if self._unsub_push_watchdog is None:
+            self._unsub_push_watchdog = async_call_later(
+                self.hass, PUSH_STALE_AFTER, self._async_push_watchdog
+            )
+
+    async def async_request_device_refresh(self, uuid: str) -> None:
+        """Refresh a device once a burst of data events for it is over."""
+        self.data_events += 1
+        self._device_changed[uuid] = time.monotonic()
+        if (debouncer := self._device_debouncers.get(uuid)) is None:
+            debouncer = self._device_debouncers[uuid] = Debouncer(
+                self.hass,
+                LOGGER,
+                cooldown=DATA_EVENT_COOLDOWN,
+                immediate=False,
+                function=partial(self._async_refresh_device, uuid),
+            )
+        await debouncer.async_call()
+
+    async def _async_refresh_device(self, uuid: str) -> None:
+        """Refresh a single device."""
+        self.data_event_refreshes += 1
+        if uuid in self._device_retries:
+            if (cancel_retry := self._device_retries[uuid]) is not None:
+                cancel_retry()
+                await self._async_retry_device(uuid, DEVICE_RETRY_INTERVAL, None)
+            return
+        if (coordinator := self.device_coordinators.get(uuid)) is not None:
+            await coordinator.async_refresh()
+
+    @callback
+    def _async_push_watchdog(self, _now: Any) -> None:
+        """Tighten polling when push has gone quiet."""
+        self._unsub_push_watchdog = None
+        assert self._last_push is not None
+        if self.push_healthy:
+            self._unsub_push_watchdog = async_call_later(
+                self.hass,
+                PUSH_STALE_AFTER.total_seconds() - (time.monotonic() - self._last_push),
+                self._async_push_watchdog,
+            )
+            return
+        LOGGER.debug("Push updates from %s stalled, polling again", self.name)
+        self._async_set_poll_interval(DEVICE_POLL_INTERVAL)
+        self.hass.async_create_task(self.async_request_refresh())
+        self.hass.async_create_task(self._meteo_coordinator.async_request_refresh())
+
+    @callback
+    def _async_set_poll_interval(self, interval: timedelta) -> None:
+        """Set the poll interval of the hub and the meteo coordinator."""
+        self.update_interval = interval
+        self._meteo_coordinator.update_interval = max(METEO_POLL_INTERVAL, interval)
+        self._async_schedule_poll()
+
+    @callback
+    def async_start_polling(self) -> None:
+        """Poll the devices every interval until the coordinator is shut down."""
+        self._async_schedule_poll()
+
+    @callback
+    def _async_schedule_poll(self) -> None:
+        """Schedule the next poll one interval from now."""
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+        if self._shut_down:
+            return
+        assert self.update_interval is not None
+        self._unsub_poll = async_call_later(
+            self.hass, self.update_interval, self._async_poll
+        )
+
+    async def _async_poll(self, _now: Any) -> None:
+        """Poll the devices, the refresh schedules the next poll."""
+        self._unsub_poll = None
+        await self.async_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel the push watchdog, the device retries and any scheduled poll."""
+        self._shut_down = True
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+        if self._unsub_push_watchdog is not None:
+            self._unsub_push_watchdog()
+            self._unsub_push_watchdog = None
+        for debouncer in self._device_debouncers.values():
+            debouncer.async_cancel()
+        for cancel_retry in self._device_retries.values():
+            if cancel_retry is not None:
+                cancel_retry()
+        self._device_retries.clear()
+        await super().async_shutdown()
+
+    def _device_from_payload(self, uuid: str, payload: dict[str, Any]) -> Remote:
+        """Build a Remote or a Climate from the payload."""
+        if uuid in self._climate_uuids:
+            return Climate(_data=payload)
+        return Remote(_data=payload)
+
+    async def _async_fetch_payload(self, uuid: str) -> dict[str, Any]:
+        """Fetch the payload of a single device from the hub."""
+        start = time.monotonic()
+        payload = await self._lookin_protocol.get_device(
+            uuid, self._device_changed.pop(uuid, None)
+        )
+        LOGGER.debug(
+            "Fetched %s %s in %.3f seconds", self.name, uuid, time.monotonic() - start
+        )
+        if uuid in self.device_coordinators:
+            # Not removed from the hub while it was fetched
+            self._catalog.async_set_remote(uuid, payload)
+        return payload
+
+    async def _async_fetch_device(self, uuid: str) -> Remote:
+        """Fetch a single device from the hub."""
+        device = self._device_from_payload(uuid, await self._async_fetch_payload(uuid))
+        if uuid in self.device_coordinators:
+            self.data[uuid] = device
+        return device
+
+    async def _async_poll_device(self, uuid: str) -> tuple[Remote, bool] | None:
+        """Poll a single device, returns the device and if its state changed.
+
+        Returns None if the device was removed while it was polled.
+        """
+        payload = await self._async_fetch_payload(uuid)
+        if (coordinator := self.device_coordinators.get(uuid)) is None:
+            return None
+        device: Remote | None = coordinator.data
+        if (
+            device is None
+            or int(payload["Updated"]) != device.updated
+            or payload["Name"] != device.name
+        ):
+            device = self.data[uuid] = self._device_from_payload(uuid, payload)
+            return device, True
+        return device, _update_status_from_payload(device, payload)
+
+    async def _async_update_data(self) -> dict[str, Remote]:
+        """Refresh all devices and notify the ones that changed."""
+        assert self.update_interval is not None
+        now = time.monotonic()
+        interval = self.update_interval.total_seconds()
+        # Devices without data yet are fetched by their retry
+        ready = [
+            uuid
+            for uuid, coordinator in self.device_coordinators.items()
+            if coordinator.data is not None
+        ]
+        uuids = [
+            uuid
+            for uuid in ready
+            if (last_push := self._last_device_push.get(uuid)) is None
+            or now - last_push >= interval
+        ]
+        self.device_polls += len(uuids)
+        self.device_polls_skipped += len(ready) - len(uuids)
+        results = await asyncio.gather(
+            *(self._async_poll_device(uuid) for uuid in uuids),
+            return_exceptions=True,
+        )
+        failed = 0
+        for uuid, result in zip(uuids, results):
+            if (coordinator := self.device_coordinators.get(uuid)) is None:
+                # Removed from the hub while it was polled
+                continue
+            if isinstance(result, Exception):
+                failed += 1
+                coordinator.async_set_update_error(result)
+            elif isinstance(result, BaseException):
+                raise result
+            elif result is not None:
+                device, changed = result
+                if changed or not coordinator.last_update_success:
+                    coordinator.async_set_updated_data(device)
+        if uuids and failed == len(uuids):
+            self._async_set_poll_interval(DEVICE_POLL_INTERVAL)
+            raise UpdateFailed(f"Failed to refresh all devices of {self.name}")
+        if not self.last_update_success or not self.push_healthy:
+            self._async_set_poll_interval(DEVICE_POLL_INTERVAL)
+        else:
+            self._async_set_poll_interval(
+                min(self.update_interval * 2, MAX_POLL_INTERVAL)
+            )
+        return self.data
@@ -0,0 +1,27 @@
+"""Diagnostics support for the lookin integration."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .models import LookinData
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    lookin_data: LookinData = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "polling": lookin_data.hub_coordinator.diagnostics,
+        "commands": asdict(lookin_data.command_stats),
+        "requests": lookin_data.lookin_protocol.diagnostics,
+        "push": {
+            **lookin_data.lookin_udp_subs.diagnostics,
+            **asdict(lookin_data.push_stats),
+        },
+    }
@@ -2,19 +2,26 @@
 from __future__ import annotations
 
 from abc import abstractmethod
+from collections.abc import Callable
 import logging
 from typing import cast
 
 from aiolookin import POWER_CMD, POWER_OFF_CMD, POWER_ON_CMD, Climate, Remote
-from aiolookin.models import Device, UDPCommandType, UDPEvent
-from homeassistant.helpers.entity import DeviceInfo
+from aiolookin.models import Device, UDPCommandType
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
 )
 
-from .const import DOMAIN, MODEL_NAMES
-from .models import LookinData
+from .const import DOMAIN, MODEL_NAMES, SIGNAL_DEVICE_READY
+from .models import LookinData, LookinDeviceRecord
+from .udp import LookinUDPEvent, parse_status
 
 LOGGER = logging.getLogger(__name__)
 
@@ -41,6 +48,45 @@ def _lookin_controlled_device_to_device_info(
     )
 
 
+@callback
+def async_add_device_entities(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    platform: Platform,
+    async_add_entities: AddEntitiesCallback,
+    create_entity: Callable[[LookinDeviceRecord, DataUpdateCoordinator], Entity],
+) -> None:
+    """Add an entity for every device of a platform.
+
+    Devices the hub did not return during setup have no data to build an
+    entity from yet, they are added once the hub coordinator reports that
+    they are ready.
+    """
+    lookin_data: LookinData = hass.data[DOMAIN][config_entry.entry_id]
+    entities = []
+    for record in lookin_data.platform_devices.get(platform, ()):
+        coordinator = lookin_data.device_coordinators[record.uuid]
+        if coordinator.data is not None:
+            entities.append(create_entity(record, coordinator))
+    async_add_entities(entities)
+
+    @callback
+    def _async_device_ready(uuid: str) -> None:
+        for record in lookin_data.platform_devices.get(platform, ()):
+            if record.uuid == uuid:
+                coordinator = lookin_data.device_coordinators[uuid]
+                async_add_entities([create_entity(record, coordinator)])
+                return
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_DEVICE_READY.format(config_entry.entry_id, platform),
+            _async_device_ready,
+        )
+    )
+
+
 class LookinDeviceMixIn:
     """A mix in to set lookin attributes for the lookin device."""
 
@@ -49,6 +95,8 @@ class LookinDeviceMixIn:
         self._lookin_device = lookin_data.lookin_device
         self._lookin_protocol = lookin_data.lookin_protocol
         self._lookin_udp_subs = lookin_data.lookin_udp_subs
+        self._hub_coordinator = lookin_data.hub_coordinator
+        self._push_stats = lookin_data.push_stats
 
 
 class LookinDeviceCoordinatorEntity(LookinDeviceMixIn, CoordinatorEntity):
@@ -150,21 +198,50 @@ class LookinPowerPushRemoteEntity(LookinPowerEntity):
     def _remote(self) -> Remote:
         return cast(Remote, self.coordinator.data)
 
+    def _update_from_status(self, status: str | None) -> None:
+        """Update properties from the status returned by the HTTP API."""
+        self._polled_status = status
+        if (value := parse_status(status)) is not None:
+            self._update_from_status_value(value)
+
     @abstractmethod
-    def _update_from_status(self, status: str) -> None:
-        """Update properties from status."""
+    def _update_from_status_value(self, status: int) -> bool:
+        """Update properties from the 16 bit status, returns if they changed."""
 
-    def _async_push_update(self, event: UDPEvent) -> None:
-        """Process an update pushed via UDP."""
+    def _async_push_update(self, event: LookinUDPEvent) -> None:
+        """Process an update pushed via UDP.
+
+        The hub broadcasts the status again when nothing changed, those
+        updates are not written to the state machine.
+        """
         LOGGER.debug("Processing push message for %s: %s", self.entity_id, event)
-        self._update_from_status(event.value)
+        self._hub_coordinator.async_push_received(self._uuid)
+        assert event.status is not None
+        if (
+            not self._update_from_status_value(event.status)
+            and self.coordinator.last_update_success
+        ):
+            self._push_stats.state_writes_suppressed += 1
+            return
+        self._push_stats.state_writes += 1
+        self._hub_coordinator.async_set_device_status(self._uuid, f"{event.status:04X}")
         self.coordinator.async_set_updated_data(self._remote)
 
-    async def _async_push_update_device(self, event: UDPEvent) -> None:
+    async def _async_push_update_device(self, event: LookinUDPEvent) -> None:
         """Process an update pushed via UDP."""
         LOGGER.debug("Processing push message for %s: %s", self.entity_id, event)
-        await self.coordinator.async_refresh()
+        self._hub_coordinator.async_push_received(self._uuid)
+        await self._hub_coordinator.async_request_device_refresh(self._uuid)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
         self._attr_name = self._remote.name
+        # Push updates do not touch the polled status, only apply it when a
+        # poll brought a new one
+        if self._remote.status != self._polled_status:
+            self._update_from_status(self._remote.status)
+        super()._handle_coordinator_update()
 
     async def async_added_to_hass(self) -> None:
         """Call when the entity is added to hass."""
@@ -184,3 +261,4 @@ class LookinPowerPushRemoteEntity(LookinPowerEntity):
                 self._async_push_update_device,
             )
         )
+        await super().async_added_to_hass()
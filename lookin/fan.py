@@ -6,16 +6,31 @@ from typing import Any, Final
 from aiolookin import Remote
 from homeassistant.components.fan import SUPPORT_OSCILLATE, FanEntity
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import DOMAIN
-from .entity import LookinPowerEntity
-from .models import LookinData
+from .entity import LookinPowerPushRemoteEntity, async_add_device_entities
+from .models import LookinData, LookinDeviceRecord
+from .udp import StatusTable
 
 FAN_SUPPORT_FLAGS: Final = SUPPORT_OSCILLATE
 
 
+def _decode_status(status: int) -> bool:
+    """Decode the status of a fan into its on flag.
+
+    1000
+    0 - 0/1 on/off
+    """
+    return status >> 12 == 1
+
+
+_STATUS_TABLE: Final = StatusTable(_decode_status)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -23,35 +38,32 @@ async def async_setup_entry(
 ) -> None:
     """Set up the fan platform for lookin from a config entry."""
     lookin_data: LookinData = hass.data[DOMAIN][config_entry.entry_id]
-    entities = []
 
-    _type_class_map = {
+    _type_class_map: dict[str, type[LookinFanBase]] = {
         "04": LookinHumidifierFan,
         "05": LookinPurifierFan,
         "07": LookinFan,
     }
-    for remote in lookin_data.devices:
-        if not (cls := _type_class_map.get(remote["Type"])):
-            continue
-        uuid = remote["UUID"]
-        device = await lookin_data.lookin_protocol.get_remote(uuid)
-        entities.append(cls(uuid=uuid, device=device, lookin_data=lookin_data))
 
-    async_add_entities(entities)
+    def _create_entity(
+        record: LookinDeviceRecord, coordinator: DataUpdateCoordinator
+    ) -> LookinFanBase:
+        return _type_class_map[record.type](
+            uuid=record.uuid,
+            device=coordinator.data,
+            lookin_data=lookin_data,
+            coordinator=coordinator,
+        )
+
+    async_add_device_entities(
+        hass, config_entry, Platform.FAN, async_add_entities, _create_entity
+    )
 
 
-class LookinFanBase(LookinPowerEntity, FanEntity):
+class LookinFanBase(LookinPowerPushRemoteEntity, FanEntity):
     """A base class for lookin fan entities."""
 
-    def __init__(
-        self,
-        uuid: str,
-        device: Remote,
-        lookin_data: LookinData,
-    ) -> None:
-        """Init the lookin fan base class."""
-        super().__init__(uuid, device, lookin_data)
-        self._is_on = False
+    _is_on = False
 
     @property
     def is_on(self) -> bool:
@@ -76,18 +88,27 @@ class LookinFanBase(LookinPowerEntity, FanEntity):
         self._is_on = False
         self.async_write_ha_state()
 
+    def _update_from_status_value(self, status: int) -> bool:
+        """Update fan property from status."""
+        if self._is_on == (is_on := _STATUS_TABLE[status]):
+            return False
+
+        self._is_on = is_on
+        return True
+
 
 class LookinFan(LookinFanBase):
     """A lookin fan."""
 
     def __init__(
         self,
+        coordinator: DataUpdateCoordinator,
         uuid: str,
         device: Remote,
         lookin_data: LookinData,
     ) -> None:
         """IR controlled fan."""
-        super().__init__(uuid, device, lookin_data)
+        super().__init__(coordinator, uuid, device, lookin_data)
         self._oscillating: bool = False
 
     @property
@@ -2,22 +2,35 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, Final
 
-from aiolookin import Remote
 from homeassistant.components.light import COLOR_MODE_ONOFF, LightEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN, TYPE_TO_PLATFORM
-from .entity import LookinPowerPushRemoteEntity
-from .models import LookinData
+from .const import DOMAIN
+from .entity import LookinPowerPushRemoteEntity, async_add_device_entities
+from .models import LookinData, LookinDeviceRecord
+from .udp import StatusTable
 
 LOGGER = logging.getLogger(__name__)
 
 
+def _decode_status(status: int) -> bool:
+    """Decode the status of a light into its on flag.
+
+    1000
+    0 - 0/1 on/off
+    """
+    return status >> 12 == 1
+
+
+_STATUS_TABLE: Final = StatusTable(_decode_status)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -25,24 +38,20 @@ async def async_setup_entry(
 ) -> None:
     """Set up the light platform for lookin from a config entry."""
     lookin_data: LookinData = hass.data[DOMAIN][config_entry.entry_id]
-    entities = []
-
-    for remote in lookin_data.devices:
-        if TYPE_TO_PLATFORM.get(remote["Type"]) != Platform.LIGHT:
-            continue
-        uuid = remote["UUID"]
-        coordinator = lookin_data.device_coordinators[uuid]
-        device: Remote = coordinator.data
-        entities.append(
-            LookinLightEntity(
-                coordinator=coordinator,
-                uuid=uuid,
-                device=device,
-                lookin_data=lookin_data,
-            )
+
+    def _create_entity(
+        record: LookinDeviceRecord, coordinator: DataUpdateCoordinator
+    ) -> LookinLightEntity:
+        return LookinLightEntity(
+            uuid=record.uuid,
+            device=coordinator.data,
+            lookin_data=lookin_data,
+            coordinator=coordinator,
         )
 
-    async_add_entities(entities)
+    async_add_device_entities(
+        hass, config_entry, Platform.LIGHT, async_add_entities, _create_entity
+    )
 
 
 class LookinLightEntity(LookinPowerPushRemoteEntity, LightEntity):
@@ -63,14 +72,10 @@ class LookinLightEntity(LookinPowerPushRemoteEntity, LightEntity):
         self._attr_is_on = False
         self.async_write_ha_state()
 
-    def _update_from_status(self, status: str) -> None:
-        """Update media property from status.
-
-        1000
-        0 - 0/1 on/off
-        """
-        if len(status) != 4:
-            return
-        state = status[0]
+    def _update_from_status_value(self, status: int) -> bool:
+        """Update light property from status."""
+        if self._attr_is_on == (is_on := _STATUS_TABLE[status]):
+            return False
 
-        self._attr_is_on = state == "1"
+        self._attr_is_on = is_on
+        return True
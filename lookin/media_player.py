@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from typing import Final
 
 from aiolookin import Remote
 from homeassistant.components.media_player import (
@@ -22,9 +23,10 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN, TYPE_TO_PLATFORM
-from .entity import LookinPowerPushRemoteEntity
-from .models import LookinData
+from .const import DOMAIN
+from .entity import LookinPowerPushRemoteEntity, async_add_device_entities
+from .models import LookinData, LookinDeviceRecord
+from .udp import StatusTable
 
 LOGGER = logging.getLogger(__name__)
 
@@ -44,6 +46,24 @@ _FUNCTION_NAME_TO_FEATURE = {
 }
 
 
+def _decode_status(status: int) -> tuple[str, bool]:
+    """Decode the status of a media player into its state and mute flag.
+
+    00F0
+    0 - 0/1 on/off
+    0 - sourse
+    F - volume, 0 - muted, 1 - volume up, F - volume down
+    0 - not used
+    """
+    return (
+        STATE_ON if status >> 12 == 1 else STATE_STANDBY,
+        status >> 4 & 0xF == 0,
+    )
+
+
+_STATUS_TABLE: Final = StatusTable(_decode_status)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -51,25 +71,21 @@ async def async_setup_entry(
 ) -> None:
     """Set up the media_player platform for lookin from a config entry."""
     lookin_data: LookinData = hass.data[DOMAIN][config_entry.entry_id]
-    entities = []
-
-    for remote in lookin_data.devices:
-        if TYPE_TO_PLATFORM.get(remote["Type"]) != Platform.MEDIA_PLAYER:
-            continue
-        uuid = remote["UUID"]
-        coordinator = lookin_data.device_coordinators[uuid]
-        device: Remote = coordinator.data
-        entities.append(
-            LookinMedia(
-                coordinator=coordinator,
-                uuid=uuid,
-                device=device,
-                lookin_data=lookin_data,
-                device_class=_TYPE_TO_DEVICE_CLASS[remote["Type"]],
-            )
+
+    def _create_entity(
+        record: LookinDeviceRecord, coordinator: DataUpdateCoordinator
+    ) -> LookinMedia:
+        return LookinMedia(
+            uuid=record.uuid,
+            device=coordinator.data,
+            lookin_data=lookin_data,
+            coordinator=coordinator,
+            device_class=_TYPE_TO_DEVICE_CLASS[record.type],
         )
 
-    async_add_entities(entities)
+    async_add_device_entities(
+        hass, config_entry, Platform.MEDIA_PLAYER, async_add_entities, _create_entity
+    )
 
 
 class LookinMedia(LookinPowerPushRemoteEntity, MediaPlayerEntity):
@@ -127,19 +143,11 @@ class LookinMedia(LookinPowerPushRemoteEntity, MediaPlayerEntity):
         self._attr_state = STATE_ON
         self.async_write_ha_state()
 
-    def _update_from_status(self, status: str) -> None:
-        """Update media property from status.
-
-        00F0
-        0 - 0/1 on/off
-        0 - sourse
-        F - volume, 0 - muted, 1 - volume up, F - volume down
-        0 - not used
-        """
-        if len(status) != 4:
-            return
-        state = status[0]
-        mute = status[2]
-
-        self._attr_state = STATE_ON if state == "1" else STATE_STANDBY
-        self._attr_is_volume_muted = mute == "0"
+    def _update_from_status_value(self, status: int) -> bool:
+        """Update media property from status."""
+        decoded = _STATUS_TABLE[status]
+        if (self._attr_state, self._attr_is_volume_muted) == decoded:
+            return False
+
+        self._attr_state, self._attr_is_volume_muted = decoded
+        return True
@@ -1,20 +1,77 @@
 """The lookin integration models."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, NamedTuple
 
-from aiolookin import Device, LookInHttpProtocol, LookinUDPSubscriptions
+from aiolookin import Device
+from homeassistant.const import Platform
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
+from .const import TYPE_TO_PLATFORM
+from .coordinator import LookinHubCoordinator
+from .protocol import LookinHubProtocol
+from .udp import LookinUDPDispatcher
+
+
+class MeteoReading(NamedTuple):
+    """A temperature and humidity reading pushed by the lookin device."""
+
+    temperature: float
+    humidity: float
+
+
+class LookinDeviceRecord:
+    """A device stored on the lookin device."""
+
+    __slots__ = ("uuid", "type")
+
+    def __init__(self, uuid: str, device_type: str) -> None:
+        """Init the record."""
+        self.uuid = uuid
+        self.type = device_type
+
+
+def index_devices(
+    devices: list[dict[str, Any]]
+) -> dict[Platform, list[LookinDeviceRecord]]:
+    """Group the devices returned by the hub by the platform they belong to."""
+    index: dict[Platform, list[LookinDeviceRecord]] = {}
+    for remote in devices:
+        if (platform := TYPE_TO_PLATFORM.get(remote["Type"])) is not None:
+            index.setdefault(platform, []).append(
+                LookinDeviceRecord(remote["UUID"], remote["Type"])
+            )
+    return index
+
+
+@dataclass
+class LookinCommandStats:
+    """Counters for the commands sent to the lookin device."""
+
+    conditioner_requests: int = 0
+    conditioner_transmissions: int = 0
+
+
+@dataclass
+class LookinPushStats:
+    """Counters for the state updates pushed by the lookin device."""
+
+    state_writes: int = 0
+    state_writes_suppressed: int = 0
+
 
 @dataclass
 class LookinData:
     """Data for the lookin integration."""
 
-    lookin_udp_subs: LookinUDPSubscriptions
+    lookin_udp_subs: LookinUDPDispatcher
     lookin_device: Device
     meteo_coordinator: DataUpdateCoordinator
-    devices: list[dict[str, Any]]
-    lookin_protocol: LookInHttpProtocol
+    platform_devices: dict[Platform, list[LookinDeviceRecord]]
+    lookin_protocol: LookinHubProtocol
     device_coordinators: dict[str, DataUpdateCoordinator]
+    hub_coordinator: LookinHubCoordinator
+    platforms: list[Platform]
+    command_stats: LookinCommandStats = field(default_factory=LookinCommandStats)
+    push_stats: LookinPushStats = field(default_factory=LookinPushStats)
@@ -0,0 +1,417 @@
+"""The lookin integration hub protocol."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
+from functools import partial
+import heapq
+import itertools
+import time
+from typing import Any, Final, TypeVar, cast
+
+from aiohttp import ClientConnectionError, ClientSession, TCPConnector, TraceConfig
+from aiolookin import Climate, Device, IRFormat, LookInHttpProtocol, MeteoSensor
+import async_timeout
+
+from .const import HUB_KEEPALIVE_TIMEOUT, HUB_REQUEST_CONCURRENCY
+
+PRIORITY_INTERACTIVE: Final = 0
+PRIORITY_BACKGROUND: Final = 1
+
+PRIORITY_NAMES: Final = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Commands give up after this many seconds, including the wait for a slot.
+# Background requests are bound by the timeouts of aiolookin.
+REQUEST_DEADLINES: Final[dict[int, float | None]] = {
+    PRIORITY_INTERACTIVE: 5.0,
+    PRIORITY_BACKGROUND: None,
+}
+
+CIRCUIT_CLOSED: Final = "closed"
+CIRCUIT_OPEN: Final = "open"
+CIRCUIT_HALF_OPEN: Final = "half_open"
+# Consecutive failures after which requests to a hub fail fast
+CIRCUIT_FAILURE_THRESHOLD: Final = 3
+# Seconds before a single request is let through to probe the hub again
+CIRCUIT_RESET_TIMEOUT: Final = 30.0
+
+_T = TypeVar("_T")
+
+
+class LookinRequestScheduler:
+    """Limit the number of parallel requests to a hub.
+
+    Requests that have to wait are served by priority, so commands sent
+    by the user go before the polls that are queued up behind them.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        """Init the scheduler."""
+        self._concurrency = concurrency
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self.max_queue_depth = 0
+        self.requests = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.total_wait = dict.fromkeys(PRIORITY_NAMES, 0.0)
+        self.max_wait = dict.fromkeys(PRIORITY_NAMES, 0.0)
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the scheduler state for diagnostics."""
+        return {
+            "concurrency": self._concurrency,
+            "active": self._active,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            **{
+                name: {
+                    "requests": self.requests[priority],
+                    "average_wait": round(
+                        self.total_wait[priority] / (self.requests[priority] or 1), 3
+                    ),
+                    "max_wait": round(self.max_wait[priority], 3),
+                }
+                for priority, name in PRIORITY_NAMES.items()
+            },
+        }
+
+    @asynccontextmanager
+    async def async_slot(self, priority: int) -> AsyncIterator[None]:
+        """Wait for a free slot to send a request to the hub."""
+        start = time.monotonic()
+        if self._active < self._concurrency and not self._waiters:
+            self._active += 1
+        else:
+            future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was handed over just before we were cancelled
+                    self._release()
+                raise
+        wait = time.monotonic() - start
+        self.requests[priority] += 1
+        self.total_wait[priority] += wait
+        self.max_wait[priority] = max(self.max_wait[priority], wait)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        """Hand the slot over to the next waiter or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+
+class LookinHubUnavailable(ClientConnectionError):
+    """Raised instead of sending a request while the hub is unreachable."""
+
+
+@dataclass
+class LookinRequestAttempt:
+    """A request guarded by the circuit breaker."""
+
+    sent: bool = False
+
+
+class LookinCircuitBreaker:
+    """Fail fast while a hub is unreachable.
+
+    The circuit opens after CIRCUIT_FAILURE_THRESHOLD consecutive requests
+    failed to reach the hub. While it is open requests are rejected
+    without touching the network. After CIRCUIT_RESET_TIMEOUT the circuit
+    is half open and the next request probes the hub, everything else is
+    still rejected until the probe closes the circuit or opens it again.
+
+    Only requests that were sent to the hub count, a request that times
+    out while it waits for a slot says nothing about the hub.
+    """
+
+    def __init__(self) -> None:
+        """Init the circuit breaker."""
+        self.state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the circuit state for diagnostics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+    @contextmanager
+    def async_guard(self) -> Iterator[LookinRequestAttempt]:
+        """Guard a request, raises LookinHubUnavailable if the circuit is open.
+
+        The caller marks the attempt as sent once the request goes out.
+        """
+        self._async_before_request()
+        attempt = LookinRequestAttempt()
+        try:
+            yield attempt
+        except (asyncio.TimeoutError, ClientConnectionError):
+            if attempt.sent:
+                self._async_record_failure()
+            else:
+                self._probing = False
+            raise
+        except asyncio.CancelledError:
+            self._probing = False
+            raise
+        except Exception:
+            # The hub answered, even if the answer was an error
+            self._async_record_success()
+            raise
+        else:
+            self._async_record_success()
+
+    def _async_before_request(self) -> None:
+        """Reject the request unless the circuit lets it through."""
+        if (
+            self.state == CIRCUIT_OPEN
+            and time.monotonic() - self._opened_at >= CIRCUIT_RESET_TIMEOUT
+        ):
+            self.state = CIRCUIT_HALF_OPEN
+        if self.state == CIRCUIT_OPEN or (
+            self.state == CIRCUIT_HALF_OPEN and self._probing
+        ):
+            self.rejected += 1
+            raise LookinHubUnavailable("The hub is unreachable")
+        if self.state == CIRCUIT_HALF_OPEN:
+            self._probing = True
+
+    def _async_record_success(self) -> None:
+        """Close the circuit."""
+        self.state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def _async_record_failure(self) -> None:
+        """Count a failure and open the circuit when needed."""
+        self._failures += 1
+        self._probing = False
+        if self.state == CIRCUIT_OPEN or (
+            self.state == CIRCUIT_CLOSED and self._failures < CIRCUIT_FAILURE_THRESHOLD
+        ):
+            return
+        self.trips += 1
+        self.state = CIRCUIT_OPEN
+        self._opened_at = time.monotonic()
+
+
+@dataclass
+class LookinConnectionStats:
+    """Counters for the connections opened to a hub."""
+
+    created: int = 0
+    reused: int = 0
+    queued: int = 0
+
+
+def _create_hub_session() -> tuple[ClientSession, LookinConnectionStats]:
+    """Create a session with a connection pool of its own for a hub."""
+    stats = LookinConnectionStats()
+
+    async def _on_connection_create_end(*_: Any) -> None:
+        stats.created += 1
+
+    async def _on_connection_reuseconn(*_: Any) -> None:
+        stats.reused += 1
+
+    async def _on_connection_queued_start(*_: Any) -> None:
+        stats.queued += 1
+
+    trace_config = TraceConfig()
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    trace_config.on_connection_queued_start.append(_on_connection_queued_start)
+    connector = TCPConnector(
+        limit=HUB_REQUEST_CONCURRENCY,
+        limit_per_host=HUB_REQUEST_CONCURRENCY,
+        keepalive_timeout=HUB_KEEPALIVE_TIMEOUT,
+    )
+    return ClientSession(connector=connector, trace_configs=[trace_config]), stats
+
+
+class LookinHubProtocol(LookInHttpProtocol):
+    """A LookInHttpProtocol that sends every request through the scheduler.
+
+    Reads of the same endpoint that overlap share a single request and
+    its result instead of hitting the hub once per caller.
+
+    Every hub gets a session of its own, so the connections to it are
+    kept alive and limited independently of the rest of Home Assistant.
+    The session has to be closed with async_close.
+
+    Commands have a deadline and all requests go through a circuit breaker,
+    so calls fail fast instead of piling up while the hub is offline.
+    """
+
+    def __init__(self, api_uri: str) -> None:
+        """Init the hub protocol."""
+        session, self.connection_stats = _create_hub_session()
+        super().__init__(api_uri=api_uri, session=session)
+        self._session = session
+        self.scheduler = LookinRequestScheduler(HUB_REQUEST_CONCURRENCY)
+        self.breaker = LookinCircuitBreaker()
+        # The requests in flight by endpoint and uuid, with the time they started
+        self._inflight: dict[
+            tuple[str, str | None], tuple[float, asyncio.Future[Any]]
+        ] = {}
+        self.collapsed: Counter[str] = Counter()
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the protocol state for diagnostics."""
+        return {
+            "scheduler": self.scheduler.diagnostics,
+            "circuit_breaker": self.breaker.diagnostics,
+            "in_flight": len(self._inflight),
+            "collapsed": dict(self.collapsed),
+            "connections": asdict(self.connection_stats),
+        }
+
+    async def async_close(self) -> None:
+        """Close the session and its connections."""
+        await self._session.close()
+
+    async def _async_single_flight(
+        self,
+        endpoint: str,
+        uuid: str | None,
+        not_before: float | None,
+        request: Callable[..., Awaitable[_T]],
+        *args: Any,
+    ) -> _T:
+        """Share the result of a request with everyone asking while it runs.
+
+        A request that started before not_before may return a state that
+        changed since, a new request is sent instead of sharing it.
+        """
+        key = (endpoint, uuid)
+        inflight = self._inflight.get(key)
+        if inflight is not None and (not_before is None or inflight[0] >= not_before):
+            self.collapsed[endpoint] += 1
+            future = inflight[1]
+        else:
+            future = asyncio.ensure_future(request(*args))
+            self._inflight[key] = (time.monotonic(), future)
+            future.add_done_callback(partial(self._async_request_done, key))
+        return cast(_T, await asyncio.shield(future))
+
+    def _async_request_done(
+        self, key: tuple[str, str | None], future: asyncio.Future[Any]
+    ) -> None:
+        """Remove a finished request from the in flight table."""
+        if (inflight := self._inflight.get(key)) is not None and inflight[1] is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Retrieve the exception so it is not logged when nobody waits
+            future.exception()
+
+    async def _async_scheduled(
+        self, priority: int, request: Callable[..., Awaitable[_T]], *args: Any
+    ) -> _T:
+        """Send a request when the scheduler has a free slot."""
+        with self.breaker.async_guard() as attempt:
+            async with async_timeout.timeout(REQUEST_DEADLINES[priority]):
+                async with self.scheduler.async_slot(priority):
+                    attempt.sent = True
+                    return await request(*args)
+
+    async def get_info(self) -> Device:
+        """Get the hub info."""
+        return await self._async_single_flight(
+            "info",
+            None,
+            None,
+            self._async_scheduled,
+            PRIORITY_BACKGROUND,
+            super().get_info,
+        )
+
+    async def get_meteo_sensor(self) -> MeteoSensor:
+        """Get the meteo sensor of the hub."""
+        return await self._async_single_flight(
+            "meteo",
+            None,
+            None,
+            self._async_scheduled,
+            PRIORITY_BACKGROUND,
+            super().get_meteo_sensor,
+        )
+
+    async def get_devices(self) -> list[dict[str, Any]]:
+        """Get the devices stored on the hub."""
+        return await self._async_single_flight(
+            "devices",
+            None,
+            None,
+            self._async_scheduled,
+            PRIORITY_BACKGROUND,
+            super().get_devices,
+        )
+
+    async def get_device(
+        self, uuid: str, not_before: float | None = None
+    ) -> dict[str, Any]:
+        """Get a device stored on the hub.
+
+        Only a request started at or after the not_before monotonic time is
+        shared, pass the time the device changed to get its new state.
+        """
+        return await self._async_single_flight(
+            "device",
+            uuid,
+            not_before,
+            self._async_scheduled,
+            PRIORITY_BACKGROUND,
+            super().get_device,
+            uuid,
+        )
+
+    async def update_device_name(self, name: str) -> None:
+        """Rename the hub."""
+        await self._async_scheduled(
+            PRIORITY_INTERACTIVE, super().update_device_name, name
+        )
+
+    async def send_command(self, uuid: str, command: str, signal: str) -> None:
+        """Send a command of a device stored on the hub."""
+        await self._async_scheduled(
+            PRIORITY_INTERACTIVE, super().send_command, uuid, command, signal
+        )
+
+    async def send_ir(self, ir_format: IRFormat, codes: str) -> None:
+        """Send raw IR codes."""
+        await self._async_scheduled(
+            PRIORITY_INTERACTIVE, super().send_ir, ir_format, codes
+        )
+
+    async def update_conditioner(self, climate: Climate) -> None:
+        """Send the state of a conditioner."""
+        await self._async_scheduled(
+            PRIORITY_INTERACTIVE, super().update_conditioner, climate
+        )
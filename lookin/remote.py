@@ -2,15 +2,14 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable, Coroutine, Iterable
-from datetime import timedelta
+from collections.abc import Iterable
 import logging
 from typing import Any
 
 from aiolookin import IRFormat, Remote
 from homeassistant.components.remote import ATTR_DELAY_SECS, RemoteEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_OFF
+from homeassistant.const import STATE_OFF, Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -18,8 +17,8 @@ from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import DOMAIN
-from .entity import LookinPowerEntity
-from .models import LookinData
+from .entity import LookinPowerEntity, async_add_device_entities
+from .models import LookinData, LookinDeviceRecord
 
 KNOWN_FORMAT_PREFIXES = {f"{format.value}:": format for format in IRFormat}
 
@@ -33,45 +32,20 @@ async def async_setup_entry(
 ) -> None:
     """Set up the light platform for lookin from a config entry."""
     lookin_data: LookinData = hass.data[DOMAIN][config_entry.entry_id]
-    entities = []
-
-    for remote in lookin_data.devices:
-        if remote["Type"] != "00":
-            continue
-        uuid = remote["UUID"]
-
-        def _wrap_async_update(
-            uuid: str,
-        ) -> Callable[[], Coroutine[None, Any, Remote]]:
-            """Create a function to capture the uuid cell variable."""
-
-            async def _async_update() -> Remote:
-                return await lookin_data.lookin_protocol.get_remote(uuid)
-
-            return _async_update
-
-        coordinator = DataUpdateCoordinator(
-            hass,
-            LOGGER,
-            name=f"{config_entry.title} {uuid}",
-            update_method=_wrap_async_update(uuid),
-            update_interval=timedelta(
-                seconds=60
-            ),  # Updates are pushed (fallback is polling)
-        )
-        await coordinator.async_refresh()
-        device: Remote = coordinator.data
-
-        entities.append(
-            LookinRemoteEntity(
-                uuid=uuid,
-                device=device,
-                lookin_data=lookin_data,
-                coordinator=coordinator,
-            )
+
+    def _create_entity(
+        record: LookinDeviceRecord, coordinator: DataUpdateCoordinator
+    ) -> LookinRemoteEntity:
+        return LookinRemoteEntity(
+            uuid=record.uuid,
+            device=coordinator.data,
+            lookin_data=lookin_data,
+            coordinator=coordinator,
         )
 
-    async_add_entities(entities)
+    async_add_device_entities(
+        hass, config_entry, Platform.REMOTE, async_add_entities, _create_entity
+    )
 
 
 class LookinRemoteEntity(LookinPowerEntity, RemoteEntity, RestoreEntity):
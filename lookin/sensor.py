@@ -66,12 +66,12 @@ class LookinSensorEntity(LookinDeviceCoordinatorEntity, SensorEntity):
         super().__init__(lookin_data)
         self.entity_description = description
         self._attr_name = f"{self._lookin_device.name} {description.name}"
-        self._attr_native_value = getattr(self.coordinator.data, description.key)
+        self._attr_native_value = getattr(self.coordinator.data, description.key, None)
         self._attr_unique_id = f"{self._lookin_device.id}-{description.key}"
 
     def _handle_coordinator_update(self) -> None:
         """Update the state of the entity."""
         self._attr_native_value = getattr(
-            self.coordinator.data, self.entity_description.key
+            self.coordinator.data, self.entity_description.key, None
         )
         super()._handle_coordinator_update()
@@ -0,0 +1,373 @@
+"""The lookin integration UDP push handling."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import contextlib
+import itertools
+import logging
+import socket
+from typing import Any, Dict, Final, Optional, Tuple, TypeVar
+
+from aiolookin.models import UDPCommandType
+from aiolookin.protocol import LOOKIN_PORT
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN
+
+LOGGER = logging.getLogger(__name__)
+
+DATA_UDP_LISTENER: Final = f"{DOMAIN}_udp_listener"
+
+_SubscriptionKey = Tuple[str, UDPCommandType, Optional[str]]
+StatusNibbles = Tuple[int, int, int, int]
+_T = TypeVar("_T")
+
+_UPDATED: Final = b"updated"
+_TYPE_IR: Final = b"87"
+_TYPE_METEO: Final = b"FE"
+_TYPE_DATA: Final = b"data"
+_IR_STATE: Final = b"FE"
+_METEO_STATE: Final = b"00"
+# Bound of the fields a listener keeps decoded, in case of garbage traffic
+_MAX_INTERNED: Final = 1024
+
+
+def _intern(interned: dict[bytes, str] | None, raw: bytes) -> str:
+    """Return the str for an ascii field of a datagram.
+
+    Device ids and uuids repeat in every packet, with a table each of them
+    is decoded once.
+    """
+    if interned is None:
+        return raw.decode()
+    if (value := interned.get(raw)) is None:
+        if len(interned) >= _MAX_INTERNED:
+            interned.clear()
+        value = interned[raw] = raw.decode()
+    return value
+
+
+class StatusTable(Dict[int, _T]):
+    """Decoded remote statuses shared by all entities of a type.
+
+    A 16 bit status is decoded the first time it is seen, after that it
+    costs a dict lookup and every entity gets the same immutable value.
+    The statuses come from the network, a decoder returns a value for
+    statuses it does not know instead of raising.
+    """
+
+    def __init__(self, decode: Callable[[int], _T]) -> None:
+        """Init the table."""
+        super().__init__()
+        self._decode = decode
+
+    def __missing__(self, status: int) -> _T:
+        """Decode a status that was not seen before."""
+        value = self[status] = self._decode(status)
+        return value
+
+
+def status_to_nibbles(status: int) -> StatusNibbles:
+    """Split a 16 bit remote status into its four nibbles."""
+    return (status >> 12, status >> 8 & 0xF, status >> 4 & 0xF, status & 0xF)
+
+
+STATUS_NIBBLES: Final[StatusTable[StatusNibbles]] = StatusTable(status_to_nibbles)
+
+
+def parse_status(status: str | None) -> int | None:
+    """Convert the status string of a remote returned by the HTTP API."""
+    if status is None or len(status) != 4:
+        return None
+    try:
+        return int(status, 16)
+    except ValueError:
+        return None
+
+
+class LookinUDPEvent:
+    """A UDP event with its fields decoded once when the datagram arrives.
+
+    For ir events nibbles holds the four nibbles of the status of the
+    remote: power, source, volume and an unused one for media players and
+    lights, mode, temperature, fan mode and swing mode for conditioners.
+    Meteo events carry the temperature and the humidity.
+    """
+
+    __slots__ = (
+        "raw",
+        "device_id",
+        "type",
+        "uuid",
+        "status",
+        "nibbles",
+        "temperature",
+        "humidity",
+    )
+
+    def __init__(
+        self,
+        raw: bytes,
+        device_id: str,
+        command_type: UDPCommandType,
+        uuid: str | None = None,
+        status: int | None = None,
+        temperature: float | None = None,
+        humidity: float | None = None,
+    ) -> None:
+        """Init the event."""
+        self.raw = raw
+        self.device_id = device_id
+        self.type = command_type
+        self.uuid = uuid
+        self.status = status
+        self.nibbles = None if status is None else STATUS_NIBBLES[status]
+        self.temperature = temperature
+        self.humidity = humidity
+
+    def __repr__(self) -> str:
+        """Return the datagram the event was parsed from."""
+        return f"<LookinUDPEvent {self.raw!r}>"
+
+
+def parse_datagram(
+    data: bytes, interned: dict[bytes, str] | None = None
+) -> LookinUDPEvent | None:
+    """Parse a datagram sent by a lookin device.
+
+    The fields are read straight from the bytes and the hex values are
+    converted to numbers without going through str. The ids are decoded
+    through the interned table when one is passed. Examples:
+
+    meteo sensor update  LOOK.in:Updated!98F33093:FE:00:00E201A8
+    ir sensor update     LOOK.in:Updated!98F33093:87:FE:FC124000
+    device state update  LOOK.in:Updated!98F33093:data:FC12
+    remote button update LOOK.in:Updated!98F33093:data:F6C6:05
+    """
+    if not data.startswith(b"LOOK"):
+        return None
+    parts = data.rstrip().split(b":", 4)
+    if len(parts) < 4:
+        return None
+    command, _, device_id = parts[1].partition(b"!")
+    if command.lower() != _UPDATED or not device_id:
+        return None
+    type_code = parts[2]
+    try:
+        if type_code == _TYPE_IR:
+            if len(parts) != 5 or parts[3] != _IR_STATE or len(value := parts[4]) != 8:
+                return None
+            return LookinUDPEvent(
+                data,
+                _intern(interned, device_id),
+                UDPCommandType.ir,
+                _intern(interned, value[:4]),
+                status=int(value[4:], 16),
+            )
+        if type_code == _TYPE_METEO:
+            if (
+                len(parts) != 5
+                or parts[3] != _METEO_STATE
+                or len(value := parts[4]) != 8
+            ):
+                return None
+            return LookinUDPEvent(
+                data,
+                _intern(interned, device_id),
+                UDPCommandType.meteo,
+                temperature=int(value[:4], 16) / 10,
+                humidity=int(value[4:], 16) / 10,
+            )
+    except ValueError:
+        return None
+    if type_code == _TYPE_DATA:
+        return LookinUDPEvent(
+            data,
+            _intern(interned, device_id),
+            UDPCommandType.data,
+            _intern(interned, parts[3]),
+        )
+    return None
+
+
+def _create_udp_socket() -> socket.socket:
+    """Create a socket that receives the broadcasts of all lookin devices."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    with contextlib.suppress(AttributeError, OSError):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(("", LOOKIN_PORT))
+    sock.setblocking(False)
+    return sock
+
+
+class LookinUDPProtocol(asyncio.DatagramProtocol):
+    """Parse the datagrams of lookin devices and pass them on."""
+
+    def __init__(self, listener: LookinUDPListener) -> None:
+        """Init the protocol."""
+        self._listener = listener
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        """Process a datagram."""
+        if (event := parse_datagram(data, self._listener.interned)) is not None:
+            self._listener.notify_event(event)
+
+    def error_received(self, exc: Exception) -> None:
+        """Ignore errors."""
+
+
+class LookinUDPDispatcher:
+    """Dispatch UDP events to the entities of a hub.
+
+    Subscriptions are indexed by (device_id, command_type, uuid) and kept in
+    dicts, so subscribing, unsubscribing and dispatching an event do not
+    depend on how many entities are subscribed. Whether a callback is a
+    coroutine function is checked once when it subscribes instead of on
+    every event.
+
+    Events are dispatched on the next iteration of the event loop and only
+    the latest event for each key is kept until then. When the loop lags
+    behind a burst of packets the entities process the newest state once
+    instead of every state in between.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init the dispatcher."""
+        self._hass = hass
+        self._index: dict[_SubscriptionKey, dict[int, tuple[Callable, bool]]] = {}
+        self._tokens = itertools.count()
+        self._pending: dict[_SubscriptionKey, LookinUDPEvent] = {}
+        self.events = 0
+        self.superseded = 0
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the dispatch state for diagnostics."""
+        return {
+            "subscriptions": sum(len(callbacks) for callbacks in self._index.values()),
+            "events": self.events,
+            "superseded": self.superseded,
+        }
+
+    def subscribe_event(
+        self,
+        device_id: str,
+        command_type: UDPCommandType,
+        uuid: str | None,
+        callback: Callable,
+    ) -> Callable:
+        """Subscribe to lookin push updates."""
+        key = (device_id, command_type, uuid)
+        token = next(self._tokens)
+        self._index.setdefault(key, {})[token] = (
+            callback,
+            asyncio.iscoroutinefunction(callback),
+        )
+
+        def _remove_call(*_: Any) -> None:
+            callbacks = self._index[key]
+            del callbacks[token]
+            if not callbacks:
+                del self._index[key]
+
+        return _remove_call
+
+    def _subscribers(
+        self, key: _SubscriptionKey
+    ) -> dict[int, tuple[Callable, bool]] | None:
+        """Return the subscribers of a key or of its command type without a uuid."""
+        device_id, command_type, uuid = key
+        if (callbacks := self._index.get(key)) is None and uuid is not None:
+            callbacks = self._index.get((device_id, command_type, None))
+        return callbacks
+
+    def notify_event(self, event: LookinUDPEvent) -> None:
+        """Queue an event for the subscribers, replacing an older one.
+
+        Events for a uuid nobody subscribed to, like the data events of a
+        remote that was just added in the app, go to the subscribers of
+        the command type without a uuid. They are still queued by their
+        own uuid so events of different remotes do not replace each other.
+        """
+        key = (event.device_id, event.type, event.uuid)
+        if not self._subscribers(key):
+            return
+        self.events += 1
+        if not self._pending:
+            self._hass.loop.call_soon(self._dispatch_pending)
+        elif key in self._pending:
+            self.superseded += 1
+        self._pending[key] = event
+
+    def _dispatch_pending(self) -> None:
+        """Notify the subscribers of the queued events."""
+        pending = self._pending
+        self._pending = {}
+        for key, event in pending.items():
+            if not (callbacks := self._subscribers(key)):
+                continue
+            for handler, is_coroutine in tuple(callbacks.values()):
+                if is_coroutine:
+                    self._hass.async_create_task(handler(event))
+                else:
+                    handler(event)
+
+
+class LookinUDPListener:
+    """The UDP listener shared by all lookin config entries.
+
+    Every hub broadcasts on the same port, so a single socket receives the
+    traffic of all of them. Each packet is parsed once and handed to the
+    dispatcher of the hub that sent it. The ids decoded from the packets
+    are kept until the last dispatcher unregisters.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init the listener."""
+        self._hass = hass
+        self._dispatchers: dict[str, LookinUDPDispatcher] = {}
+        self._lock = asyncio.Lock()
+        self._transport: asyncio.BaseTransport | None = None
+        self.interned: dict[bytes, str] = {}
+
+    async def async_register(
+        self, device_id: str, dispatcher: LookinUDPDispatcher
+    ) -> CALLBACK_TYPE:
+        """Register the dispatcher of a hub, starts the socket when needed."""
+        self._dispatchers[device_id] = dispatcher
+        async with self._lock:
+            if self._transport is None:
+                self._transport, _ = await self._hass.loop.create_datagram_endpoint(
+                    lambda: LookinUDPProtocol(self), sock=_create_udp_socket()
+                )
+
+        @callback
+        def _async_unregister() -> None:
+            del self._dispatchers[device_id]
+            if self._dispatchers:
+                return
+            if self._transport is not None:
+                self._transport.close()
+                self._transport = None
+            self.interned.clear()
+            if self._hass.data.get(DATA_UDP_LISTENER) is self:
+                del self._hass.data[DATA_UDP_LISTENER]
+
+        return _async_unregister
+
+    def notify_event(self, event: LookinUDPEvent) -> None:
+        """Hand an event to the dispatcher of the hub that sent it."""
+        if (dispatcher := self._dispatchers.get(event.device_id)) is not None:
+            dispatcher.notify_event(event)
+
+
+async def async_register_udp_dispatcher(
+    hass: HomeAssistant, device_id: str, dispatcher: LookinUDPDispatcher
+) -> CALLBACK_TYPE:
+    """Start receiving UDP events for a hub on the shared listener."""
+    if (listener := hass.data.get(DATA_UDP_LISTENER)) is None:
+        listener = hass.data[DATA_UDP_LISTENER] = LookinUDPListener(hass)
+    return await listener.async_register(device_id, dispatcher)
@@ -1,9 +1,8 @@
 """The lookin integration vacuum platform."""
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Final
 
-from aiolookin import Remote
 from homeassistant.components.vacuum import (
     SERVICE_START,
     SERVICE_STOP,
@@ -12,16 +11,31 @@ from homeassistant.components.vacuum import (
     VacuumEntity,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import DOMAIN
-from .entity import LookinPowerEntity
-from .models import LookinData
+from .entity import LookinPowerPushRemoteEntity, async_add_device_entities
+from .models import LookinData, LookinDeviceRecord
+from .udp import StatusTable
 
 SUPPORT_FLAGS: int = SUPPORT_TURN_ON | SUPPORT_TURN_OFF
 
 
+def _decode_status(status: int) -> str:
+    """Decode the status of a vacuum into the last service it was sent.
+
+    1000
+    0 - 0/1 on/off
+    """
+    return SERVICE_START if status >> 12 == 1 else SERVICE_STOP
+
+
+_STATUS_TABLE: Final = StatusTable(_decode_status)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -29,36 +43,26 @@ async def async_setup_entry(
 ) -> None:
     """Set up the lookin vacuums."""
     lookin_data: LookinData = hass.data[DOMAIN][config_entry.entry_id]
-    entities = []
-
-    for remote in lookin_data.devices:
-        if remote["Type"] != "06":
-            continue
-        uuid = remote["UUID"]
-        device = await lookin_data.lookin_protocol.get_remote(uuid)
-        entities.append(
-            LookinVacuum(
-                uuid=uuid,
-                device=device,
-                lookin_data=lookin_data,
-            )
+
+    def _create_entity(
+        record: LookinDeviceRecord, coordinator: DataUpdateCoordinator
+    ) -> LookinVacuum:
+        return LookinVacuum(
+            uuid=record.uuid,
+            device=coordinator.data,
+            lookin_data=lookin_data,
+            coordinator=coordinator,
         )
 
-    async_add_entities(entities)
+    async_add_device_entities(
+        hass, config_entry, Platform.VACUUM, async_add_entities, _create_entity
+    )
 
 
-class LookinVacuum(LookinPowerEntity, VacuumEntity):
+class LookinVacuum(LookinPowerPushRemoteEntity, VacuumEntity):
     """Representation of a lookin vacuum."""
 
-    def __init__(
-        self,
-        uuid: str,
-        device: Remote,
-        lookin_data: LookinData,
-    ) -> None:
-        """Initialize the vacuum."""
-        super().__init__(uuid, device, lookin_data)
-        self._status = SERVICE_STOP
+    _status = SERVICE_STOP
 
     @property
     def should_poll(self) -> bool:
@@ -91,3 +95,11 @@ class LookinVacuum(LookinPowerEntity, VacuumEntity):
         await self._async_send_command(self._power_off_command)
         self._status = SERVICE_STOP
         self.async_write_ha_state()
+
+    def _update_from_status_value(self, status: int) -> bool:
+        """Update vacuum property from status."""
+        if self._status == (vacuum_status := _STATUS_TABLE[status]):
+            return False
+
+        self._status = vacuum_status
+        return True
@@ -1,10 +1,25 @@
 """Tests for the lookin integration."""
 from __future__ import annotations
 
+import asyncio
+from contextlib import ExitStack
+import copy
+import socket
+from typing import Any
 from unittest.mock import MagicMock, patch
 
-from homeassistant.components.lookin.aiolookin import Climate, Device, Remote
+from homeassistant.components.lookin.aiolookin import (
+    Climate,
+    Device,
+    MeteoSensor,
+    Remote,
+)
+from homeassistant.components.lookin.const import DOMAIN
 from homeassistant.components.zeroconf import HaServiceInfo
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from tests.common import MockConfigEntry
 
 DEVICE_ID = "98F33163"
 MODULE = "homeassistant.components.lookin"
@@ -50,3 +65,119 @@ def _patch_get_info(device=None, exception=None):
         return device if device else _mocked_device()
 
     return patch(f"{MODULE_CONFIG_FLOW}.LookInHttpProtocol.get_info", new=_get_info)
+
+
+HUB_INFO = {
+    "Type": "Remote",
+    "MRDC": "02000105001K0000",
+    "Status": "Running",
+    "ID": DEVICE_ID,
+    "Name": DEVICE_NAME,
+    "Time": "1630000000",
+    "Timezone": "+3",
+    "PowerMode": "5v",
+    "CurrentVoltage": "5610",
+    "Firmware": "2.38",
+    "Temperature": "54",
+    "HomeKit": "1",
+    "EcoMode": "off",
+    "SensorMode": "0",
+}
+METEO = {"Humidity": "45.0", "Pressure": "1000", "Temperature": "22.5", "Updated": "1"}
+
+
+def _remote_payload(
+    device_type: str, name: str, status: str = "1000", functions=("power",)
+) -> dict[str, Any]:
+    return {
+        "Type": device_type,
+        "Name": name,
+        "Updated": "1",
+        "Status": status,
+        "Functions": [{"Type": "single", "Name": function} for function in functions],
+    }
+
+
+def _udp_socket() -> socket.socket:
+    sock, _ = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    return sock
+
+
+class MockHub:
+    """A lookin hub that answers the HTTP API from memory."""
+
+    def __init__(self) -> None:
+        """Init the hub with a TV and a conditioner."""
+        self.devices: dict[str, dict[str, Any]] = {
+            "0001": _remote_payload("01", "TV", functions=("power", "volup")),
+            "EE01": {**_remote_payload("EF", "AC", status="3700"), "Extra": "0001"},
+        }
+        self.calls: list[Any] = []
+        self.gate: asyncio.Event | None = None
+
+    async def _async_request(self, call: Any) -> None:
+        self.calls.append(call)
+        if self.gate is not None:
+            await self.gate.wait()
+
+    def patch(self) -> ExitStack:
+        """Patch the HTTP API and the UDP socket of the integration."""
+        hub = self
+
+        async def _get_info(_self) -> Device:
+            await hub._async_request("info")
+            return Device(_data=HUB_INFO)
+
+        async def _get_devices(_self) -> list[dict[str, Any]]:
+            await hub._async_request("devices")
+            return [
+                {"Type": payload["Type"], "UUID": uuid, "Updated": payload["Updated"]}
+                for uuid, payload in hub.devices.items()
+            ]
+
+        async def _get_device(_self, uuid: str) -> dict[str, Any]:
+            await hub._async_request(("device", uuid))
+            return copy.deepcopy(hub.devices[uuid])
+
+        async def _get_meteo_sensor(_self) -> MeteoSensor:
+            await hub._async_request("meteo")
+            return MeteoSensor(_data=METEO)
+
+        async def _update_conditioner(_self, climate: Climate) -> None:
+            await hub._async_request(("conditioner", climate.to_status))
+
+        async def _send_command(_self, uuid: str, command: str, signal: str) -> None:
+            await hub._async_request(("command", uuid, command))
+
+        stack = ExitStack()
+        for name, new in (
+            ("get_info", _get_info),
+            ("get_devices", _get_devices),
+            ("get_device", _get_device),
+            ("get_meteo_sensor", _get_meteo_sensor),
+            ("update_conditioner", _update_conditioner),
+            ("send_command", _send_command),
+        ):
+            stack.enter_context(
+                patch(f"{MODULE}.protocol.LookInHttpProtocol.{name}", new=new)
+            )
+        stack.enter_context(patch(f"{MODULE}.udp._create_udp_socket", _udp_socket))
+        return stack
+
+
+async def _async_setup_hub(
+    hass: HomeAssistant, entry: MockConfigEntry | None = None
+) -> MockConfigEntry:
+    """Set up a config entry for the hub, the hub must be patched."""
+    if entry is None:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_HOST: IP_ADDRESS},
+            title=DEFAULT_ENTRY_TITLE,
+            unique_id=DEVICE_ID,
+        )
+        entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
@@ -0,0 +1,76 @@
+"""Define tests for the lookin climate platform."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN
+from homeassistant.components.climate.const import (
+    ATTR_FAN_MODE,
+    ATTR_HVAC_MODE,
+    HVAC_MODE_COOL,
+    HVAC_MODE_HEAT,
+    SERVICE_SET_FAN_MODE,
+    SERVICE_SET_HVAC_MODE,
+    SERVICE_SET_TEMPERATURE,
+)
+from homeassistant.components.lookin.const import DOMAIN
+from homeassistant.components.lookin.udp import parse_datagram
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from . import DEVICE_ID, MockHub, _async_setup_hub
+
+from tests.common import async_fire_time_changed
+
+
+async def test_changes_are_sent_in_one_transmission(hass: HomeAssistant):
+    """Test service calls made together are sent in a single transmission."""
+    hub = MockHub()
+    with hub.patch():
+        await _async_setup_hub(hass)
+        entity_id = hass.states.async_entity_ids(CLIMATE_DOMAIN)[0]
+
+        for service, data in (
+            (SERVICE_SET_HVAC_MODE, {ATTR_HVAC_MODE: HVAC_MODE_COOL}),
+            (SERVICE_SET_TEMPERATURE, {ATTR_TEMPERATURE: 24}),
+            (SERVICE_SET_FAN_MODE, {ATTR_FAN_MODE: "high"}),
+        ):
+            await hass.services.async_call(
+                CLIMATE_DOMAIN,
+                service,
+                {ATTR_ENTITY_ID: entity_id, **data},
+                blocking=True,
+            )
+        state = hass.states.get(entity_id)
+        assert state.state == HVAC_MODE_COOL
+        assert state.attributes[ATTR_TEMPERATURE] == 24
+        assert not [call for call in hub.calls if call[0] == "conditioner"]
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+
+    assert [call for call in hub.calls if call[0] == "conditioner"] == [
+        ("conditioner", "2830")
+    ]
+
+
+async def test_unknown_pushed_status_is_ignored(hass: HomeAssistant):
+    """Test a pushed status with modes out of range leaves the state alone."""
+    hub = MockHub()
+    with hub.patch():
+        entry = await _async_setup_hub(hass)
+        lookin_udp_subs = hass.data[DOMAIN][entry.entry_id].lookin_udp_subs
+        entity_id = hass.states.async_entity_ids(CLIMATE_DOMAIN)[0]
+
+        for payload, hvac_mode in (
+            ("87:FE:EE01F8F0", HVAC_MODE_HEAT),
+            ("87:FE:EE012830", HVAC_MODE_COOL),
+        ):
+            event = parse_datagram(f"LOOK.in:Updated!{DEVICE_ID}:{payload}".encode())
+            assert event is not None
+            lookin_udp_subs.notify_event(event)
+            await hass.async_block_till_done()
+            assert hass.states.get(entity_id).state == hvac_mode
+
+    assert hass.states.get(entity_id).attributes[ATTR_TEMPERATURE] == 24
@@ -0,0 +1,197 @@
+"""Define tests for the lookin integration setup."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN
+from homeassistant.components.climate.const import (
+    ATTR_CURRENT_HUMIDITY,
+    ATTR_CURRENT_TEMPERATURE,
+    HVAC_MODE_HEAT,
+)
+from homeassistant.components.lookin.catalog import SAVE_DELAY
+from homeassistant.components.lookin.const import DOMAIN
+from homeassistant.components.lookin.coordinator import (
+    DATA_EVENT_COOLDOWN,
+    DEVICE_LIST_INTERVAL,
+    DEVICE_POLL_INTERVAL,
+    MAX_POLL_INTERVAL,
+    METEO_POLL_INTERVAL,
+    PUSH_STALE_AFTER,
+)
+from homeassistant.components.lookin.udp import parse_datagram
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from . import DEVICE_ID, MockHub, _async_setup_hub
+
+from tests.common import async_fire_time_changed
+
+
+async def test_removed_device_is_unlinked(hass: HomeAssistant):
+    """Test a remote removed in the app is dropped by the device list check."""
+    hub = MockHub()
+    with hub.patch():
+        entry = await _async_setup_hub(hass)
+        hub_coordinator = hass.data[DOMAIN][entry.entry_id].hub_coordinator
+        device_registry = dr.async_get(hass)
+        assert device_registry.async_get_device({(DOMAIN, "0001")}) is not None
+
+        del hub.devices["0001"]
+        now = dt_util.utcnow() + DEVICE_LIST_INTERVAL
+        async_fire_time_changed(hass, now)
+        await hass.async_block_till_done()
+        async_fire_time_changed(hass, now + timedelta(seconds=DATA_EVENT_COOLDOWN + 1))
+        await hass.async_block_till_done()
+
+    assert "0001" not in hub_coordinator.device_coordinators
+    assert "0001" not in hub_coordinator.data
+    assert "EE01" in hub_coordinator.device_coordinators
+    assert device_registry.async_get_device({(DOMAIN, "0001")}) is None
+
+
+async def test_device_removed_while_polled(hass: HomeAssistant):
+    """Test a device removed during a poll is skipped instead of failing it."""
+    hub = MockHub()
+    with hub.patch():
+        entry = await _async_setup_hub(hass)
+        hub_coordinator = hass.data[DOMAIN][entry.entry_id].hub_coordinator
+        hub.calls.clear()
+        hub.gate = asyncio.Event()
+        refresh = asyncio.create_task(hub_coordinator.async_refresh())
+        while ("device", "0001") not in hub.calls:
+            await asyncio.sleep(0)
+
+        hub_coordinator.async_remove_device("0001")
+        hub.gate.set()
+        await refresh
+
+    assert hub_coordinator.last_update_success
+    assert "0001" not in hub_coordinator.data
+    assert "EE01" in hub_coordinator.data
+
+
+async def test_data_event_burst_is_refreshed_once(hass: HomeAssistant):
+    """Test a burst of data events of a device leads to a single fetch."""
+    hub = MockHub()
+    with hub.patch():
+        entry = await _async_setup_hub(hass)
+        lookin_data = hass.data[DOMAIN][entry.entry_id]
+        hub.calls.clear()
+        hub.devices["0001"]["Name"] = "Bedroom TV"
+
+        for _ in range(3):
+            event = parse_datagram(f"LOOK.in:Updated!{DEVICE_ID}:data:0001".encode())
+            assert event is not None
+            lookin_data.lookin_udp_subs.notify_event(event)
+            await hass.async_block_till_done()
+        assert hub.calls == []
+
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=DATA_EVENT_COOLDOWN + 1)
+        )
+        await hass.async_block_till_done()
+
+    assert hub.calls == [("device", "0001")]
+    assert lookin_data.hub_coordinator.data_events == 3
+    assert lookin_data.hub_coordinator.data_event_refreshes == 1
+    assert lookin_data.device_coordinators["0001"].data.name == "Bedroom TV"
+
+
+async def test_warm_start_from_catalog(hass: HomeAssistant, hass_storage):
+    """Test a hub set up before starts from its catalog without fetching."""
+    hub = MockHub()
+    with hub.patch():
+        entry = await _async_setup_hub(hass)
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=SAVE_DELAY + 1)
+        )
+        await hass.async_block_till_done()
+        assert f"{DOMAIN}.{entry.entry_id}" in hass_storage
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+        hub.calls.clear()
+        hub.devices["EE01"]["Status"] = "2700"
+        await _async_setup_hub(hass, entry)
+
+    # Only the device list is checked against the hub in the background, the
+    # state of the devices is reconciled by the regular polls and pushes
+    assert hub.calls == ["info", "devices"]
+    climate = hass.states.get(hass.states.async_entity_ids(CLIMATE_DOMAIN)[0])
+    assert climate.state == HVAC_MODE_HEAT
+    assert climate.attributes[ATTR_CURRENT_TEMPERATURE] == 22.5
+
+
+async def test_polling_backs_off_while_push_works(hass: HomeAssistant):
+    """Test polls slow down while the hub pushes and speed up when it stops."""
+    hub = MockHub()
+    with hub.patch():
+        entry = await _async_setup_hub(hass)
+        hub_coordinator = hass.data[DOMAIN][entry.entry_id].hub_coordinator
+        meteo_coordinator = hass.data[DOMAIN][entry.entry_id].meteo_coordinator
+        assert hub_coordinator.update_interval == DEVICE_POLL_INTERVAL
+
+        hub_coordinator.async_push_received(None)
+        await hub_coordinator.async_refresh()
+        assert hub_coordinator.update_interval == DEVICE_POLL_INTERVAL * 2
+        for _ in range(10):
+            await hub_coordinator.async_refresh()
+        assert hub_coordinator.update_interval == MAX_POLL_INTERVAL
+        assert meteo_coordinator.update_interval == MAX_POLL_INTERVAL
+
+        # The hub has not pushed anything since
+        hub_coordinator._last_push -= PUSH_STALE_AFTER.total_seconds()
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + PUSH_STALE_AFTER + timedelta(seconds=1)
+        )
+        await hass.async_block_till_done()
+
+    assert not hub_coordinator.push_healthy
+    assert hub_coordinator.update_interval == DEVICE_POLL_INTERVAL
+    assert meteo_coordinator.update_interval == METEO_POLL_INTERVAL
+
+
+async def test_hub_polls_until_unloaded(hass: HomeAssistant):
+    """Test the hub polls its devices until the entry is unloaded."""
+    hub = MockHub()
+    with hub.patch():
+        entry = await _async_setup_hub(hass)
+        hub.calls.clear()
+        now = dt_util.utcnow() + DEVICE_POLL_INTERVAL + timedelta(seconds=1)
+        async_fire_time_changed(hass, now)
+        await hass.async_block_till_done()
+        assert set(hub.calls) == {("device", "0001"), ("device", "EE01")}
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        hub.calls.clear()
+        async_fire_time_changed(hass, now + MAX_POLL_INTERVAL)
+        await hass.async_block_till_done()
+
+    assert hub.calls == []
+
+
+async def test_meteo_push_updates_all_entities(hass: HomeAssistant):
+    """Test a pushed meteo reading reaches the sensors and the conditioner."""
+    hub = MockHub()
+    with hub.patch():
+        entry = await _async_setup_hub(hass)
+        lookin_data = hass.data[DOMAIN][entry.entry_id]
+        hub.calls.clear()
+        event = parse_datagram(f"LOOK.in:Updated!{DEVICE_ID}:FE:00:00E201A8".encode())
+        assert event is not None
+        lookin_data.lookin_udp_subs.notify_event(event)
+        await hass.async_block_till_done()
+
+    assert hub.calls == []
+    climate = hass.states.get(hass.states.async_entity_ids(CLIMATE_DOMAIN)[0])
+    assert climate.attributes[ATTR_CURRENT_TEMPERATURE] == 22.6
+    assert climate.attributes[ATTR_CURRENT_HUMIDITY] == 42
+    assert {
+        hass.states.get(entity_id).state
+        for entity_id in hass.states.async_entity_ids(SENSOR_DOMAIN)
+    } == {"22.6", "42.4"}
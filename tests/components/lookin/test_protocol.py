@@ -0,0 +1,246 @@
+"""Define tests for the lookin hub protocol."""
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import ClientConnectionError
+from homeassistant.components.lookin.protocol import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CIRCUIT_RESET_TIMEOUT,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    LookinCircuitBreaker,
+    LookinHubProtocol,
+    LookinHubUnavailable,
+    LookinRequestScheduler,
+)
+import pytest
+
+from . import MODULE
+
+MODULE_PROTOCOL = f"{MODULE}.protocol"
+
+
+async def _async_request(
+    scheduler: LookinRequestScheduler,
+    priority: int,
+    name: str,
+    order: list[str],
+    release: asyncio.Event,
+) -> None:
+    async with scheduler.async_slot(priority):
+        order.append(name)
+        await release.wait()
+
+
+async def test_scheduler_limits_concurrency():
+    """Test no more requests than the concurrency are active at once."""
+    scheduler = LookinRequestScheduler(2)
+    order: list[str] = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(
+            _async_request(scheduler, PRIORITY_BACKGROUND, str(i), order, release)
+        )
+        for i in range(5)
+    ]
+    await asyncio.sleep(0)
+    assert order == ["0", "1"]
+    assert scheduler.diagnostics["queue_depth"] == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["0", "1", "2", "3", "4"]
+    assert scheduler.diagnostics["active"] == 0
+    assert scheduler.diagnostics["max_queue_depth"] == 3
+    assert scheduler.diagnostics["background"]["requests"] == 5
+
+
+async def test_scheduler_serves_interactive_first():
+    """Test queued interactive requests go before queued background ones."""
+    scheduler = LookinRequestScheduler(1)
+    order: list[str] = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_async_request(scheduler, priority, name, order, release))
+        for priority, name in (
+            (PRIORITY_BACKGROUND, "poll 1"),
+            (PRIORITY_BACKGROUND, "poll 2"),
+            (PRIORITY_BACKGROUND, "poll 3"),
+            (PRIORITY_INTERACTIVE, "command 1"),
+            (PRIORITY_INTERACTIVE, "command 2"),
+        )
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["poll 1", "command 1", "command 2", "poll 2", "poll 3"]
+
+
+async def test_scheduler_cancelled_waiter():
+    """Test a cancelled waiter does not take or leak a slot."""
+    scheduler = LookinRequestScheduler(1)
+    order: list[str] = []
+    release = asyncio.Event()
+    first = asyncio.create_task(
+        _async_request(scheduler, PRIORITY_BACKGROUND, "first", order, release)
+    )
+    cancelled = asyncio.create_task(
+        _async_request(scheduler, PRIORITY_INTERACTIVE, "cancelled", order, release)
+    )
+    last = asyncio.create_task(
+        _async_request(scheduler, PRIORITY_BACKGROUND, "last", order, release)
+    )
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    release.set()
+    await asyncio.gather(first, last)
+    assert cancelled.cancelled()
+    assert order == ["first", "last"]
+    assert scheduler.diagnostics["active"] == 0
+
+
+def _fail(breaker: LookinCircuitBreaker, exception: Exception) -> None:
+    with pytest.raises(type(exception)), breaker.async_guard() as attempt:
+        attempt.sent = True
+        raise exception
+
+
+def test_circuit_opens_after_consecutive_failures():
+    """Test the circuit opens after the threshold and rejects requests."""
+    breaker = LookinCircuitBreaker()
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD - 1):
+        _fail(breaker, asyncio.TimeoutError())
+    assert breaker.state == CIRCUIT_CLOSED
+
+    _fail(breaker, ClientConnectionError())
+    assert breaker.state == CIRCUIT_OPEN
+    assert breaker.trips == 1
+
+    with pytest.raises(LookinHubUnavailable), breaker.async_guard():
+        pass
+    assert breaker.rejected == 1
+
+
+def test_circuit_ignores_errors_from_the_hub():
+    """Test an error answered by the hub resets the failure count."""
+    breaker = LookinCircuitBreaker()
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD - 1):
+        _fail(breaker, asyncio.TimeoutError())
+    _fail(breaker, ValueError())
+    _fail(breaker, asyncio.TimeoutError())
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_circuit_ignores_requests_that_were_not_sent():
+    """Test a timeout before the request was sent is not a failure."""
+    breaker = LookinCircuitBreaker()
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        with pytest.raises(asyncio.TimeoutError), breaker.async_guard():
+            raise asyncio.TimeoutError
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.diagnostics["consecutive_failures"] == 0
+
+
+def test_circuit_half_open_probe():
+    """Test a single probe is let through after the reset timeout."""
+    breaker = LookinCircuitBreaker()
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        _fail(breaker, asyncio.TimeoutError())
+    assert breaker.state == CIRCUIT_OPEN
+
+    later = breaker._opened_at + CIRCUIT_RESET_TIMEOUT
+    with patch(f"{MODULE_PROTOCOL}.time.monotonic", return_value=later):
+        with breaker.async_guard():
+            assert breaker.state == CIRCUIT_HALF_OPEN
+            with pytest.raises(LookinHubUnavailable), breaker.async_guard():
+                pass
+    assert breaker.state == CIRCUIT_CLOSED
+
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        _fail(breaker, asyncio.TimeoutError())
+    later = breaker._opened_at + CIRCUIT_RESET_TIMEOUT
+    with patch(f"{MODULE_PROTOCOL}.time.monotonic", return_value=later):
+        _fail(breaker, asyncio.TimeoutError())
+    assert breaker.state == CIRCUIT_OPEN
+    assert breaker.trips == 3
+
+
+async def test_queued_commands_do_not_open_the_circuit():
+    """Test commands that time out waiting behind polls are not hub failures."""
+    protocol = LookinHubProtocol(api_uri="http://127.0.0.1")
+    release = asyncio.Event()
+
+    async def _slow_get_device(self, uuid):
+        await release.wait()
+        return {}
+
+    send_command = AsyncMock()
+    try:
+        with patch(
+            f"{MODULE_PROTOCOL}.LookInHttpProtocol.get_device", _slow_get_device
+        ), patch(
+            f"{MODULE_PROTOCOL}.LookInHttpProtocol.send_command", send_command
+        ), patch.dict(
+            f"{MODULE_PROTOCOL}.REQUEST_DEADLINES", {PRIORITY_INTERACTIVE: 0.01}
+        ):
+            polls = [
+                asyncio.create_task(protocol.get_device(uuid))
+                for uuid in ("0001", "0002")
+            ]
+            while protocol.scheduler.diagnostics["active"] < 2:
+                await asyncio.sleep(0)
+            for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+                with pytest.raises(asyncio.TimeoutError):
+                    await protocol.send_command("0003", "power", "FF")
+
+            assert protocol.breaker.state == CIRCUIT_CLOSED
+            assert not send_command.called
+
+            release.set()
+            assert await asyncio.gather(*polls) == [{}, {}]
+            await protocol.send_command("0003", "power", "FF")
+            assert send_command.called
+    finally:
+        release.set()
+        await protocol.async_close()
+
+
+async def test_overlapping_reads_share_a_request():
+    """Test reads of a device share a request unless it started before a change."""
+    protocol = LookinHubProtocol(api_uri="http://127.0.0.1")
+    release = asyncio.Event()
+    requests: list[str] = []
+
+    async def _get_device(self, uuid):
+        requests.append(uuid)
+        request = len(requests)
+        await release.wait()
+        return {"request": request}
+
+    try:
+        with patch(f"{MODULE_PROTOCOL}.LookInHttpProtocol.get_device", _get_device):
+            poll = asyncio.create_task(protocol.get_device("0001"))
+            await asyncio.sleep(0)
+            shared = asyncio.create_task(protocol.get_device("0001"))
+            await asyncio.sleep(0)
+            changed = asyncio.create_task(protocol.get_device("0001", time.monotonic()))
+            while len(requests) < 2:
+                await asyncio.sleep(0)
+            release.set()
+            assert await asyncio.gather(poll, shared, changed) == [
+                {"request": 1},
+                {"request": 1},
+                {"request": 2},
+            ]
+    finally:
+        release.set()
+        await protocol.async_close()
+    assert requests == ["0001", "0001"]
+    assert protocol.collapsed["device"] == 1
+    assert protocol.diagnostics["in_flight"] == 0
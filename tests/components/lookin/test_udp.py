@@ -0,0 +1,155 @@
+"""Define tests for the lookin UDP push handling."""
+from __future__ import annotations
+
+import asyncio
+
+from aiolookin.models import UDPCommandType
+from aiolookin.protocol import LookinUDPProtocol
+from homeassistant.components.lookin.udp import (
+    LookinUDPDispatcher,
+    parse_datagram,
+    parse_status,
+)
+from homeassistant.core import HomeAssistant
+import pytest
+
+from . import DEVICE_ID
+
+
+def _datagram(payload: str) -> bytes:
+    return f"LOOK.in:Updated!{DEVICE_ID}:{payload}".encode()
+
+
+def test_parse_ir_event():
+    """Test parsing an ir sensor update."""
+    event = parse_datagram(_datagram("87:FE:FC124000"))
+    assert event is not None
+    assert event.device_id == DEVICE_ID
+    assert event.type == UDPCommandType.ir
+    assert event.uuid == "FC12"
+    assert event.status == 0x4000
+    assert event.nibbles == (4, 0, 0, 0)
+
+
+def test_parse_meteo_event():
+    """Test parsing a meteo sensor update."""
+    event = parse_datagram(_datagram("FE:00:00E201A8"))
+    assert event is not None
+    assert event.type == UDPCommandType.meteo
+    assert event.uuid is None
+    assert event.temperature == 22.6
+    assert event.humidity == 42.4
+
+
+@pytest.mark.parametrize("payload", ["data:FC12", "data:F6C6:05", "data:FC12\r\n"])
+def test_parse_data_event(payload: str):
+    """Test parsing device state and remote button updates."""
+    event = parse_datagram(_datagram(payload))
+    assert event is not None
+    assert event.type == UDPCommandType.data
+    assert event.uuid == payload[5:9]
+    assert event.status is None
+
+
+@pytest.mark.parametrize(
+    "payload", ["87:FE:FC124000", "FE:00:00E201A8", "data:FC12", "data:F6C6:05"]
+)
+def test_parse_matches_aiolookin(payload: str):
+    """Test the fields match the ones parsed by aiolookin."""
+    data = _datagram(payload)
+    event = parse_datagram(data)
+    expected = LookinUDPProtocol._parse_event(data)
+    assert event is not None and expected is not None
+    assert (event.device_id, event.type, event.uuid) == (
+        expected.device_id,
+        expected.type,
+        expected.uuid,
+    )
+    if expected.type == UDPCommandType.ir:
+        assert event.status == int(expected.value, 16)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"NOPE:Updated!98F33163:data:FC12",
+        b"LOOK.in:Updated!98F33163:data",
+        b"LOOK.in:Updated!:data:FC12",
+        b"LOOK.in:Alive!98F33163:data:FC12",
+        _datagram("87:FE:FC12ZZZZ"),
+        _datagram("87:FE:FC1240"),
+        _datagram("87:00:FC124000"),
+        _datagram("87:FE"),
+        _datagram("FE:00:00E201"),
+        _datagram("FE:00:00E2XXA8"),
+        _datagram("FE:01:00E201A8"),
+        _datagram("AB:00:00E201A8"),
+    ],
+)
+def test_parse_malformed(data: bytes):
+    """Test malformed datagrams are ignored."""
+    assert parse_datagram(data) is None
+
+
+def test_parse_status():
+    """Test parsing the status of a remote returned by the HTTP API."""
+    assert parse_status("1000") == 0x1000
+    assert parse_status(None) is None
+    assert parse_status("100") is None
+    assert parse_status("10ZZ") is None
+
+
+async def test_dispatch_unknown_uuids(hass: HomeAssistant):
+    """Test events of uuids nobody subscribed to are not merged together."""
+    dispatcher = LookinUDPDispatcher(hass)
+    unknown = []
+    known = []
+    dispatcher.subscribe_event(DEVICE_ID, UDPCommandType.data, None, unknown.append)
+    dispatcher.subscribe_event(DEVICE_ID, UDPCommandType.data, "F6C6", known.append)
+
+    for payload in ("data:AAAA", "data:BBBB", "data:BBBB", "data:F6C6"):
+        event = parse_datagram(_datagram(payload))
+        assert event is not None
+        dispatcher.notify_event(event)
+    await asyncio.sleep(0)
+
+    assert [event.uuid for event in unknown] == ["AAAA", "BBBB"]
+    assert [event.uuid for event in known] == ["F6C6"]
+    assert dispatcher.diagnostics["superseded"] == 1
+
+
+async def test_dispatch_latest_wins(hass: HomeAssistant):
+    """Test only the latest event of a device is dispatched after a burst."""
+    dispatcher = LookinUDPDispatcher(hass)
+    received = []
+    other = []
+    dispatcher.subscribe_event(DEVICE_ID, UDPCommandType.ir, "FC12", received.append)
+    dispatcher.subscribe_event(DEVICE_ID, UDPCommandType.ir, "F6C6", other.append)
+
+    for payload in ("87:FE:FC124000", "87:FE:F6C61000", "87:FE:FC121000"):
+        event = parse_datagram(_datagram(payload))
+        assert event is not None
+        dispatcher.notify_event(event)
+    await asyncio.sleep(0)
+
+    assert [event.status for event in received] == [0x1000]
+    assert [event.status for event in other] == [0x1000]
+    assert dispatcher.diagnostics["superseded"] == 1
+
+    event = parse_datagram(_datagram("87:FE:FC120000"))
+    assert event is not None
+    dispatcher.notify_event(event)
+    await asyncio.sleep(0)
+    assert [event.status for event in received] == [0x1000, 0]
+
+
+def test_parse_interned():
+    """Test the ids are decoded once when a table is passed."""
+    interned: dict[bytes, str] = {}
+    first = parse_datagram(_datagram("87:FE:FC124000"), interned)
+    second = parse_datagram(_datagram("data:FC12"), interned)
+    assert first is not None and second is not None
+    assert first.device_id is second.device_id
+    assert first.uuid is second.uuid
+    assert interned == {DEVICE_ID.encode(): DEVICE_ID, b"FC12": "FC12"}